@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for generate_keywords.py and expand_locations.py
+
+Runs the keyword pipeline (generate -> external sort -> dedup -> write) one
+keyword Type at a time with the location list scaled up synthetically (1x,
+10x, 100x by default), and times the location catalog parse and the
+per-province module generator with the city lists scaled the same way. Each
+case records wall time, items per second and tracemalloc peak memory.
+
+Synthetic locations are "<name> 2", "<name> 3", ... appended after the real
+ones, and the spec's top-N location slices (Types 5-7) are scaled by the
+same factor, so every Type over locations grows with the scale; only Type
+3, which has no location field, stays the same size. Each Type is capped
+at --limit keywords times the scale factor, so a 100x run generates 100
+times the keywords of a 1x run without taking hours; capped cases are
+marked in the report.
+
+With the default --memory-budget most Types sort in one in-memory buffer,
+so each scale also runs its largest Type with a --spill-budget sort buffer
+small enough to spill runs to disk and k-way merge them.
+
+Results are compared with a stored baseline and the script exits non-zero if
+a rate drops, or a memory peak grows, by more than --tolerance. Everything
+runs offline against temporary files.
+
+Rates depend on the machine, so store the baseline with --update-baseline
+on the box that runs the benchmarks (memory peaks are portable).
+
+--require-baseline makes a missing baseline an error, for CI.
+
+Usage:
+  python scripts/benchmark_keywords.py [--scales 1 10 100] [--limit 50000] [--json results.json]
+  python scripts/benchmark_keywords.py --update-baseline
+  python scripts/benchmark_keywords.py --require-baseline
+"""
+
+import argparse
+import functools
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import generate_keywords as gk
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "benchmarks" / "keyword_baseline.json"
+BASELINE_VERSION = 1
+# Cases faster than this are too noisy to compare rates on
+MIN_COMPARABLE_SECONDS = 0.05
+# Memory peaks below this are allocator noise, not regressions
+MIN_MEMORY_DELTA = 1024 * 1024
+
+
+# --- Synthetic Scaling ---
+def scaled(values, factor, suffix=" {}"):
+    """The values followed by factor - 1 numbered copies of each: 'Durban', ..., 'Durban 2', ..."""
+    return list(values) + [value + suffix.format(copy)
+                           for copy in range(2, factor + 1) for value in values]
+
+
+def scaled_spec(spec, factor):
+    """The spec with the slices of location dimensions (location_top50, ...) scaled by factor."""
+    dimensions = {name: {**entry, "slice": entry["slice"] * factor}
+                  if "slice" in entry and entry.get("from") == "location" else entry
+                  for name, entry in spec["dimensions"].items()}
+    return {"dimensions": dimensions, "types": spec["types"]}
+
+
+def scaled_provinces(frontend_provinces, factor):
+    """PROVINCES with every province's city list scaled up, slugs and names numbered alike."""
+    result = {}
+    for province_slug, province in frontend_provinces.items():
+        cities = list(province["cities"])
+        for copy in range(2, factor + 1):
+            cities += [{**city, "slug": f"{city['slug']}-{copy}", "name": f"{city['name']} {copy}"}
+                       for city in province["cities"]]
+        result[province_slug] = {**province, "cities": cities}
+    return result
+
+
+def _take(chunks, limit):
+    """Truncate a stream of code ranges after `limit` codes."""
+    for chunk in chunks:
+        if limit <= 0:
+            return
+        yield chunk[:limit]
+        limit -= len(chunk[:limit])
+
+
+# --- Measurement ---
+def measure(run, trace_memory):
+    """Run once; return (result, (wall, CPU) seconds, peak traced bytes or None)."""
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter(), time.process_time()
+    try:
+        result = run()
+    finally:
+        elapsed = time.perf_counter() - started[0], time.process_time() - started[1]
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def benchmark(name, run, repeat, trace_memory=True):
+    """
+    Time `run` (best of `repeat`, without tracing), then trace one more run
+    for its memory peak; tracemalloc slows allocation-heavy code too much to
+    time both at once. `run` returns (items, extra report fields).
+
+    Regressions are judged on CPU time, which a busy CI box disturbs far less
+    than wall time.
+    """
+    wall = cpu = None
+    for _ in range(repeat):
+        (items, extra), (elapsed, cpu_elapsed), _ = measure(run, trace_memory=False)
+        wall = elapsed if wall is None else min(wall, elapsed)
+        cpu = cpu_elapsed if cpu is None else min(cpu, cpu_elapsed)
+    peak = measure(run, trace_memory=True)[2] if trace_memory else None
+    return {
+        "name": name,
+        "items": items,
+        "seconds": round(wall, 4),
+        "cpu_seconds": round(cpu, 4),
+        "rate": round(items / wall, 1) if wall else 0.0,
+        "cpu_rate": round(items / cpu, 1) if cpu else 0.0,
+        "peak_bytes": peak,
+        **extra,
+    }
+
+
+def keyword_cases(spec, factor, limit, memory_budget, spill_budget, tmp_dir):
+    """Yield (name, run) for each keyword Type, and a spilling sort of the largest, at one location scale."""
+    # Runs lazily, just before this scale's first case, so it is not timed
+    gk.set_spec(scaled_spec(spec, factor))
+    gk.set_locations(scaled(gk.canonical(gk.locations), factor))
+    limit *= factor
+
+    def run_type(type_number, budget):
+        size = sum(t.size for t in gk.TEMPLATES if t.type_number == type_number)
+        codes = _take(gk.type_code_ranges(type_number), limit)
+        output_file = os.path.join(tmp_dir, f"type-{type_number}.txt")
+        unique = gk.write_keywords(gk.external_sort_unique(codes, budget, tmp_dir), output_file)[0]
+        os.remove(output_file)
+        generated = min(size, limit)
+        runs = -(-generated // max(1, budget // gk.BYTES_PER_KEYWORD))
+        return generated, {"unique": unique, "type_size": size, "capped": size > limit,
+                           "sort_runs": runs if runs > 1 else 0}
+
+    type_numbers = range(1, len(gk.KEYWORD_TYPES) + 1)
+    for type_number in type_numbers:
+        yield f"keywords/{factor}x/type-{type_number}", functools.partial(run_type, type_number, memory_budget)
+    largest = max(type_numbers, key=lambda n: sum(t.size for t in gk.TEMPLATES if t.type_number == n))
+    yield f"keywords/{factor}x/spill", functools.partial(run_type, largest, spill_budget)
+
+
+def location_cases(factor, tmp_dir):
+    """Yield (name, run) for the TypeScript parse and the province module generator at one scale."""
+    import expand_locations
+    from location_catalog import FRONTEND_LOCATIONS, build_catalog, extract_constant, load_sources
+
+    backend_data, frontend_provinces = load_sources()
+    provinces = scaled_provinces(frontend_provinces, factor)
+
+    if factor == 1:
+        def parse():
+            source = FRONTEND_LOCATIONS.read_text(encoding="utf-8")
+            parsed = extract_constant(source, "PROVINCES")
+            return sum(len(province["cities"]) for province in parsed.values()), {}
+        yield "locations/parse", parse
+
+    def modules():
+        catalog = build_catalog(backend_data, provinces)
+        out_dir = Path(tmp_dir) / f"locations-{factor}x"
+        index, _ = expand_locations.generate(
+            expand_locations.merge_provinces(provinces, catalog, {}), out_dir)
+        return sum(len(entries) for _, _, entries in index), {}
+    yield f"locations/{factor}x/modules", modules
+
+
+# --- Baseline ---
+def machine_info():
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        return None
+    return baseline if baseline.get("version") == BASELINE_VERSION else None
+
+
+def compare(results, baseline, tolerance):
+    """Return human-readable regressions of results against the baseline cases."""
+    previous = {case["name"]: case for case in baseline["cases"]}
+    regressions = []
+    for case in results:
+        old = previous.get(case["name"])
+        if old is None or old["items"] != case["items"]:
+            continue
+        if min(old["cpu_seconds"], case["cpu_seconds"]) >= MIN_COMPARABLE_SECONDS \
+                and case["cpu_rate"] < old["cpu_rate"] * (1 - tolerance):
+            regressions.append(f"{case['name']}: {case['cpu_rate']:,.0f}/s vs {old['cpu_rate']:,.0f}/s "
+                               f"baseline (per CPU second)")
+        if old["peak_bytes"] is not None and case["peak_bytes"] is not None \
+                and case["peak_bytes"] > old["peak_bytes"] * (1 + tolerance) \
+                and case["peak_bytes"] - old["peak_bytes"] > MIN_MEMORY_DELTA:
+            regressions.append(f"{case['name']}: peak {case['peak_bytes'] / 2**20:.1f} MB "
+                               f"vs {old['peak_bytes'] / 2**20:.1f} MB baseline")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the keyword generator and location scripts")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                        help="Location list scale factors (default: 1 10 100)")
+    parser.add_argument("--limit", type=int, default=50000,
+                        help="Most keywords to generate per Type at 1x; each scale caps at factor times this "
+                             "(default: 50000)")
+    parser.add_argument("--memory-budget", type=float, default=64, metavar="MB",
+                        help="Sort buffer size passed to the generator (default: 64)")
+    parser.add_argument("--spill-budget", type=float, default=1, metavar="MB",
+                        help="Sort buffer size for the spill cases, small enough to spill runs (default: 1)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case, best is kept (default: 5)")
+    parser.add_argument("--only", choices=["keywords", "locations"], help="Run one suite only")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip the tracemalloc pass (about 5x slower than the timed run)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE),
+                        help="Baseline file (default: scripts/benchmarks/keyword_baseline.json)")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--require-baseline", action="store_true",
+                        help="Fail instead of passing when there is no baseline to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown / memory growth before failing, as a fraction (default: 0.25)")
+    parser.add_argument("--json", dest="json_path", help="Also write the results as JSON")
+    parser.add_argument("--tmp-dir", default=None, help="Directory for temporary output (default: system temp dir)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    memory_budget = int(args.memory_budget * 1024 * 1024)
+    spill_budget = int(args.spill_budget * 1024 * 1024)
+    original_spec = {"dimensions": dict(gk.KEYWORD_SPEC["dimensions"]), "types": list(gk.KEYWORD_SPEC["types"])}
+    original_locations = list(gk.DIMENSIONS["location"])
+
+    print("Benchmarking keyword and location scripts...")
+    print(f"Scales: {', '.join(f'{s}x' for s in args.scales)}; limit {args.limit:,} keywords per Type "
+          f"times the scale")
+    print()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="keyword-bench-", dir=args.tmp_dir) as tmp_dir:
+        cases = []
+        for factor in args.scales:
+            if args.only in (None, "keywords"):
+                cases.append(keyword_cases(original_spec, factor, args.limit, memory_budget, spill_budget, tmp_dir))
+            if args.only in (None, "locations"):
+                cases.append(location_cases(factor, tmp_dir))
+        try:
+            for name, run in itertools.chain.from_iterable(cases):
+                case = benchmark(name, run, args.repeat, trace_memory=not args.no_memory)
+                results.append(case)
+                peak = f"peak {case['peak_bytes'] / 2**20:7.1f} MB" if case["peak_bytes"] is not None else ""
+                notes = [note for note, shown in [("capped", case.get("capped")),
+                                                  (f"{case.get('sort_runs')} runs", case.get("sort_runs"))] if shown]
+                note = f" ({', '.join(notes)})" if notes else ""
+                print(f"  {name:<28} {case['items']:>10,} in {case['seconds']:>8.3f}s "
+                      f"{case['rate']:>12,.0f}/s  {peak}{note}")
+        finally:
+            gk.set_spec(original_spec)
+            gk.set_locations(original_locations)
+    print()
+
+    report = {"version": BASELINE_VERSION, "machine": machine_info(),
+              "settings": {"limit": args.limit, "memory_budget_mb": args.memory_budget,
+                           "spill_budget_mb": args.spill_budget}, "cases": results}
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Results saved to {args.json_path}")
+
+    if args.update_baseline:
+        baseline_path = Path(args.baseline)
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Baseline saved to {baseline_path}")
+        return
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        if args.require_baseline:
+            print(f"❌ No baseline at {args.baseline}; run with --update-baseline to store one")
+            sys.exit(1)
+        print(f"⚠️  No baseline at {args.baseline}; run with --update-baseline to store one")
+        return
+    if baseline["machine"] != report["machine"]:
+        print(f"⚠️  Baseline was recorded on {baseline['machine']}, comparing anyway")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        sys.exit(1)
+    print(f"✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
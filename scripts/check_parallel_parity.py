@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Serial vs --jobs parity check for generate_keywords.py
+
+--jobs must write byte-for-byte the same keyword list and seo_keywords rows
+as a serial run. Worker processes rebuild the module state the parent set
+up (catalog locations, weighted selection, salon supply), so every option
+that changes that state gets a case here. Each case runs the generator
+twice in fresh processes, serially and with --jobs, and compares checksums
+of both outputs.
+
+Weights, salons and centroids are synthesised from a fixed seed into a
+temporary directory, so the check runs offline and gives the same inputs
+every time.
+
+Usage: python scripts/check_parallel_parity.py [--jobs 3] [--cases default catalog weights budget salons]
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import generate_keywords as gk
+
+GENERATOR = Path(__file__).resolve().parent / "generate_keywords.py"
+SEED = 7
+# Rough bounding box of South Africa, for synthetic centroids
+LATITUDES = (-34.5, -22.5)
+LONGITUDES = (17.0, 32.5)
+SALONS = 3000
+
+
+def write_inputs(directory):
+    """Write synthetic weights, salons and centroids; returns their paths."""
+    rng = random.Random(SEED)
+    locations = gk.canonical(gk.locations)
+    services = gk.DIMENSIONS["service"]
+    weights_path = directory / "weights.json"
+    weights_path.write_text(json.dumps({
+        "location": {location: rng.randint(1, 1000000) for location in locations},
+        "service": {service: rng.randint(1, 1000) for service in services},
+    }), encoding="utf-8")
+
+    centroids = [(location, rng.uniform(*LATITUDES), rng.uniform(*LONGITUDES)) for location in locations]
+    centroids_path = directory / "centroids.csv"
+    centroids_path.write_text("name,latitude,longitude\n" + "".join(
+        f'"{name}",{lat:.5f},{lon:.5f}\n' for name, lat, lon in centroids), encoding="utf-8")
+
+    # Salons cluster around a third of the centroids, so some places have no supply
+    hubs = rng.sample(centroids, len(centroids) // 3)
+    salons = []
+    for salon_id in range(SALONS):
+        _, lat, lon = rng.choice(hubs)
+        salon = {"id": salon_id, "latitude": lat + rng.gauss(0, 0.2), "longitude": lon + rng.gauss(0, 0.2),
+                 "status": "APPROVED"}
+        if rng.random() < 0.5:
+            salon["services"] = rng.sample(services, 5)
+        salons.append(salon)
+    salons_path = directory / "salons.json"
+    salons_path.write_text(json.dumps(salons), encoding="utf-8")
+    return weights_path, salons_path, centroids_path
+
+
+def cases(weights, salons, centroids):
+    return {
+        "default": [],
+        "catalog": ["--catalog"],
+        "weights": ["--weights", str(weights)],
+        "budget": ["--weights", str(weights), "--max-keywords", "500000"],
+        "salons": ["--salons", str(salons), "--centroids", str(centroids)],
+    }
+
+
+def file_sha256(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def run(arguments, directory, name):
+    """Run the generator; returns (keyword list checksum, row export checksum, keyword count)."""
+    output = directory / f"{name}.txt"
+    rows = directory / f"{name}.tsv"
+    subprocess.run([sys.executable, str(GENERATOR), *arguments, "--output", str(output),
+                    "--copy-output", str(rows), "--tmp-dir", str(directory)],
+                   check=True, stdout=subprocess.DEVNULL)
+    with open(output, "rb") as f:
+        count = sum(1 for _ in f)
+    result = file_sha256(output), file_sha256(rows), count
+    output.unlink()
+    rows.unlink()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that --jobs output matches a serial run")
+    parser.add_argument("--jobs", type=int, default=3, help="Workers for the parallel run (default: 3)")
+    parser.add_argument("--cases", nargs="+", default=None,
+                        help="Cases to run (default: all of default catalog weights budget salons)")
+    args = parser.parse_args(argv)
+    if args.jobs < 2:
+        parser.error("--jobs must be at least 2")
+
+    failures = []
+    with tempfile.TemporaryDirectory(prefix="keyword-parity-") as tmp:
+        directory = Path(tmp)
+        all_cases = cases(*write_inputs(directory))
+        unknown = sorted(set(args.cases or []) - set(all_cases))
+        if unknown:
+            parser.error(f"unknown case(s) {', '.join(unknown)}; expected {', '.join(all_cases)}")
+        print(f"Checking serial vs --jobs {args.jobs} output...")
+        for name in args.cases or all_cases:
+            started = time.perf_counter()
+            serial = run(all_cases[name], directory, f"{name}-serial")
+            parallel = run(all_cases[name] + ["--jobs", str(args.jobs)], directory, f"{name}-parallel")
+            elapsed = time.perf_counter() - started
+            if serial == parallel:
+                print(f"  ✅ {name:<8} {serial[2]:>10,} keywords, identical ({elapsed:.0f}s)")
+            else:
+                failures.append(name)
+                print(f"  ❌ {name:<8} serial {serial[2]:,} keywords, --jobs {parallel[2]:,}; "
+                      f"keyword list {'matches' if serial[0] == parallel[0] else 'differs'}, "
+                      f"rows {'match' if serial[1] == parallel[1] else 'differ'}")
+    if failures:
+        print(f"❌ --jobs output differs for: {', '.join(failures)}")
+        sys.exit(1)
+    print("✅ --jobs output matches serial output in every case")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,57 @@
 #!/usr/bin/env python3
 """
-Script to expand locationData.ts with all cities from locations.data.ts
-This will help generate more location-specific pages for SEO
+Generate per-province location modules for the frontend
+
+Merges the cities already in frontend/src/lib/locationData.ts with
+`locations_to_add` below and writes one TypeScript module per province to
+frontend/src/lib/locations/, plus an index.ts that holds only province and
+city slugs and names and a loadProvince() helper that dynamic-imports a
+single province. Pages can then ship the index and lazy-load the province
+they render instead of bundling every PROVINCES entry.
+
+Output is deterministic: provinces and cities keep their source order, and
+each module is streamed to a temporary file and renamed into place.
+
+Usage: python scripts/expand_locations.py [--out-dir frontend/src/lib/locations] [--dry-run]
+"""
+
+import argparse
+from pathlib import Path
+
+from generate_keywords import atomic_write
+from location_catalog import REPO_ROOT, build_catalog, load_sources
+
+OUTPUT_DIR = REPO_ROOT / "frontend" / "src" / "lib" / "locations"
+GENERATED_MARKER = " * AUTO-GENERATED FILE - DO NOT EDIT MANUALLY"
+HEADER = f"""/**
+{GENERATED_MARKER}
+ *
+ * Generated by: python scripts/expand_locations.py
+ * Source: frontend/src/lib/locationData.ts + locations_to_add in scripts/expand_locations.py
+ */
 """
 
-import json
-import re
+# Copy for cities that only exist in locations_to_add
+DESCRIPTION_TEMPLATE = ("Find salons and beauty services in {city}, {province}. Book appointments at "
+                        "local hair salons, nail studios, spas, and barbershops.")
+KEYWORDS_TEMPLATE = [
+    'hair salon near me {city}',
+    'nail salon near me {city}',
+    'spa near me {city}',
+    'beauty salon near me {city}',
+    'hairdresser near me {city}',
+    'gel nails near me {city}',
+    'massage near me {city}',
+    'manicure near me {city}',
+    'makeup artist near me {city}',
+    'facial near me {city}',
+]
+PROVINCE_DESCRIPTION_TEMPLATE = ("Find top-rated salons, spas, and beauty professionals in {province}. "
+                                 "Book appointments at hair salons, nail salons, barbershops, and wellness centers.")
+PROVINCE_KEYWORDS_TEMPLATE = ['{province} salons', '{province} hair salon', '{province} spa', '{province} beauty salon']
 
-# Read the locations.data.ts file structure
-# This is a simplified version - you'll need to manually map the locations
-# from backend/src/locations/locations.data.ts
+# The existing entries in locations.data.ts and locationData.ts are read by
+# location_catalog.py, so this list only needs the cities we want to add.
 
 # Major cities and suburbs to add (from locations.data.ts)
 locations_to_add = {
@@ -122,50 +164,233 @@ locations_to_add = {
 
 def generate_city_entry(slug, name, province_name, description_template, keywords_template):
     """Generate a city entry for locationData.ts"""
-    # Convert slug to display name
-    display_name = name.replace('-', ' ').title()
-    
-    # Generate description
-    description = description_template.format(city=display_name, province=province_name)
-    
-    # Generate keywords
-    keywords = [
-        f'hair salon near me {display_name}',
-        f'nail salon near me {display_name}',
-        f'spa near me {display_name}',
-        f'beauty salon near me {display_name}',
-        f'hairdresser near me {display_name}',
-        f'gel nails near me {display_name}',
-        f'massage near me {display_name}',
-        f'manicure near me {display_name}',
-        f'makeup artist near me {display_name}',
-        f'facial near me {display_name}'
-    ]
-    
+    # Slugs passed as names become display names ('de-aar' -> 'De Aar')
+    display_name = name.replace('-', ' ').title() if name == slug else name
+
     return {
         'slug': slug,
         'name': display_name,
         'province': province_name,
-        'description': description,
-        'keywords': keywords
+        'description': description_template.format(city=display_name, province=province_name),
+        'keywords': [keyword.format(city=display_name) for keyword in keywords_template],
     }
 
-# This is a helper script - the actual expansion should be done manually
-# or through a more sophisticated TypeScript parser
-print("Location expansion helper script")
-print("=" * 60)
-print()
-print("This script helps identify cities to add to locationData.ts")
-print("You'll need to manually add these to the TypeScript file")
-print()
-print(f"Total cities to add: {sum(len(cities) for cities in locations_to_add.values())}")
-print()
-for province, cities in locations_to_add.items():
-    print(f"{province}: {len(cities)} cities")
-print()
-print("Next steps:")
-print("1. Review the cities list above")
-print("2. Add them to frontend/src/lib/locationData.ts")
-print("3. Ensure proper formatting and SEO keywords")
-print("4. Run the keyword generator to create pages for all locations")
 
+def frontend_slugs(catalog):
+    """(province slug, city slug) pairs already in frontend/src/lib/locationData.ts."""
+    return {(loc["province_slug"], loc["slug"]) for loc in catalog.locations if "frontend" in loc["occurrences"]}
+
+
+def merge_provinces(frontend_provinces, catalog, additions):
+    """
+    Yield ProvinceInfo dicts: the frontend's provinces in their own order,
+    then any province only named in `additions`.
+
+    Existing cities are kept as written (first entry wins on a repeated
+    slug); added cities follow in list order, named after the catalog entry
+    for that slug when the backend has one.
+    """
+    for province_slug in dict.fromkeys([*frontend_provinces, *additions]):
+        province = frontend_provinces.get(province_slug)
+        if province is None:
+            name = catalog.provinces[province_slug]["name"]
+            province = {
+                "slug": province_slug,
+                "name": name,
+                "description": PROVINCE_DESCRIPTION_TEMPLATE.format(province=name),
+                "keywords": [keyword.format(province=name) for keyword in PROVINCE_KEYWORDS_TEMPLATE],
+                "cities": [],
+            }
+        cities = {}
+        for city in province["cities"]:
+            cities.setdefault(city["slug"], city)
+        by_slug = {loc["slug"]: loc for loc in catalog.locations if loc["province_slug"] == province_slug}
+        for slug in additions.get(province_slug, []):
+            if slug not in cities:
+                name = by_slug[slug]["name"] if slug in by_slug else slug
+                cities[slug] = generate_city_entry(slug, name, province["name"],
+                                                   DESCRIPTION_TEMPLATE, KEYWORDS_TEMPLATE)
+        yield {**province, "slug": province_slug, "cities": list(cities.values())}
+
+
+# --- TypeScript output ---
+def ts_string(value):
+    escaped = value.replace("\\", "\\\\").replace("'", "\\'").replace("\n", "\\n")
+    return f"'{escaped}'"
+
+
+def ts_list(values):
+    return "[" + ", ".join(ts_string(value) for value in values) + "]"
+
+
+def ts_identifier(slug):
+    """'western-cape' -> 'westernCape'."""
+    first, *rest = slug.split("-")
+    return first + "".join(part.title() for part in rest)
+
+
+def _city_lines(city):
+    yield "    {"
+    for field in ("slug", "name", "province", "description"):
+        yield f"      {field}: {ts_string(city[field])},"
+    yield f"      keywords: {ts_list(city['keywords'])},"
+    if city.get("popularAreas"):
+        yield f"      popularAreas: {ts_list(city['popularAreas'])},"
+    yield "    },"
+
+
+def province_module_lines(province):
+    name = ts_identifier(province["slug"])
+    yield HEADER
+    yield "import type { ProvinceInfo } from '../locationData';"
+    yield ""
+    yield f"const {name}: ProvinceInfo = {{"
+    for field in ("slug", "name", "description"):
+        yield f"  {field}: {ts_string(province[field])},"
+    yield f"  keywords: {ts_list(province['keywords'])},"
+    yield "  cities: ["
+    for city in province["cities"]:
+        yield from _city_lines(city)
+    yield "  ],"
+    yield "};"
+    yield ""
+    yield f"export default {name};"
+
+
+def index_module_lines(index):
+    """`index` is [(province slug, province name, [(city slug, city name), ...]), ...]."""
+    yield HEADER
+    yield "import type { CityInfo, ProvinceInfo } from '../locationData';"
+    yield ""
+    yield "export interface LocationIndexEntry {"
+    yield "  slug: string;"
+    yield "  name: string;"
+    yield "}"
+    yield ""
+    yield "export interface ProvinceIndexEntry extends LocationIndexEntry {"
+    yield "  cities: LocationIndexEntry[];"
+    yield "}"
+    yield ""
+    yield "export const PROVINCE_INDEX: ProvinceIndexEntry[] = ["
+    for slug, name, cities in index:
+        yield "  {"
+        yield f"    slug: {ts_string(slug)},"
+        yield f"    name: {ts_string(name)},"
+        yield "    cities: ["
+        for city_slug, city_name in cities:
+            yield f"      {{ slug: {ts_string(city_slug)}, name: {ts_string(city_name)} }},"
+        yield "    ],"
+        yield "  },"
+    yield "];"
+    yield ""
+    yield "// Each province is its own chunk, so a page only downloads the one it renders"
+    yield "export function loadProvince(provinceSlug: string): Promise<ProvinceInfo | null> {"
+    yield "  switch (provinceSlug) {"
+    for slug, _, _ in index:
+        yield f"    case {ts_string(slug)}:"
+        yield f"      return import('./{slug}').then(module => module.default);"
+    yield "    default:"
+    yield "      return Promise.resolve(null);"
+    yield "  }"
+    yield "}"
+    yield ""
+    yield "export async function loadCity(provinceSlug: string, citySlug: string): Promise<CityInfo | null> {"
+    yield "  const province = await loadProvince(provinceSlug);"
+    yield "  return province?.cities.find(city => city.slug === citySlug) || null;"
+    yield "}"
+
+
+def write_module(path, lines):
+    """Stream lines to `path` through a temporary file so readers never see a partial module."""
+    with atomic_write(path, newline="\n") as f:
+        for line in lines:
+            f.write(line)
+            f.write("\n")
+
+
+def remove_stale_modules(out_dir, written):
+    """Delete generated modules for provinces that no longer exist."""
+    removed = []
+    for path in sorted(out_dir.glob("*.ts")):
+        if path.name in written:
+            continue
+        with open(path, encoding="utf-8") as f:
+            if GENERATED_MARKER not in f.read(200):
+                continue
+        path.unlink()
+        removed.append(path.name)
+    return removed
+
+
+def generate(provinces, out_dir):
+    """Write one module per province and the index; returns the index entries and removed files."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    index = []
+    written = {"index.ts"}
+    for province in provinces:
+        write_module(out_dir / f"{province['slug']}.ts", province_module_lines(province))
+        written.add(f"{province['slug']}.ts")
+        index.append((province["slug"], province["name"],
+                      [(city["slug"], city["name"]) for city in province["cities"]]))
+    write_module(out_dir / "index.ts", index_module_lines(index))
+    return index, remove_stale_modules(out_dir, written)
+
+
+def report(catalog, existing):
+    print(f"Total cities to add: {sum(len(cities) for cities in locations_to_add.values())}")
+    print()
+    for province, cities in locations_to_add.items():
+        new = [slug for slug in dict.fromkeys(cities) if (province, slug) not in existing]
+        print(f"{province}: {len(cities)} cities ({len(new)} not yet in locationData.ts)")
+    print()
+
+    repeats = [(province, slug, count) for province, slug, source, count in catalog.in_province_repeats()
+               if source == "expand_locations"]
+    if repeats:
+        print("Listed more than once in the same province:")
+        for province, slug, count in repeats:
+            print(f"  - {slug} ({province}): {count}x")
+        print()
+    duplicates = {slug: provinces for slug, provinces in catalog.cross_province_duplicates().items()
+                  if any(loc["occurrences"].get("expand_locations") for loc in catalog.slug_index()[slug])}
+    if duplicates:
+        print("Slugs in more than one province (check which one is right):")
+        for slug, provinces in sorted(duplicates.items()):
+            print(f"  - {slug}: {', '.join(provinces)}")
+        print()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate per-province location modules for the frontend")
+    parser.add_argument("--out-dir", default=str(OUTPUT_DIR),
+                        help="Where to write the modules (default: frontend/src/lib/locations)")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be added")
+    parser.add_argument("--no-cache", action="store_true", help="Parse the TypeScript files even if cached")
+    args = parser.parse_args(argv)
+
+    backend_data, frontend_provinces = load_sources(use_cache=not args.no_cache)
+    catalog = build_catalog(backend_data, frontend_provinces)
+    existing = frontend_slugs(catalog)
+    for province_slug, slugs in locations_to_add.items():
+        for slug in slugs:
+            catalog.add("expand_locations", province_slug, slug.replace('-', ' ').title(), slug)
+
+    print("Location module generator")
+    print("=" * 60)
+    print()
+    report(catalog, existing)
+    if args.dry_run:
+        return
+
+    out_dir = Path(args.out_dir)
+    index, removed = generate(merge_provinces(frontend_provinces, catalog, locations_to_add), out_dir)
+    for slug, name, cities in index:
+        print(f"  {name}: {len(cities)} cities -> {slug}.ts")
+    for name in removed:
+        print(f"  removed stale {name}")
+    print(f"✅ {len(index)} province modules and index.ts written to {out_dir}")
+    print(f"   Total cities: {sum(len(cities) for _, _, cities in index):,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,75 @@
 """
 Keyword Generator for Stylr SA
 Generates 30,000+ SEO keywords for beauty services across South Africa
+
+Each keyword Type is a set of templates over de-duplicated dimension lists.
+Keywords stream through the pipeline as compact integer codes and are only
+rendered to strings when a sorted run is written; an external merge sort
+caps peak memory at --memory-budget rather than growing with the corpus.
+
+With --jobs N the Types are split into shards across a process pool and the
+sorted shards are k-way merged, producing the same file as a serial run
+(check_parallel_parity.py checks this for every option workers depend on).
+
+Every run also writes a manifest of its inputs. With --incremental the next
+run diffs the inputs against it, generates only the affected slice of each
+cross product, writes the added/removed keywords as delta files and patches
+the existing output.
+
+--copy-output also exports one seo_keywords row per keyword (keyword, slug,
+category, priority and the service/location it was built from) for COPY or
+scripts/load_seo_keywords.py, and --index builds a memory-mapped slug ->
+keyword index (keyword_index.py) for resolving URLs. --sitemap-dir streams
+the keywords into gzipped 50,000-URL sitemaps and an index (keyword_sitemap.py).
+--shards N also splits them into N stable hash shards with a checksum manifest,
+so loaders and warmers can work in parallel and resume (keyword_shards.py).
+
+--weights takes per-location and per-service weights (population, salon
+count, ...) from a JSON or CSV file. Types 5-7 then keep their best-scoring
+keywords over every location rather than the first 30-50 in list order, and
+--max-keywords caps the whole corpus to a page budget by the same score.
+--salons/--centroids skip service/location pages without a salon within
+--radius km (salon_supply.py).
+
+Dimensions, slices, filters and templates are declared in KEYWORD_SPEC;
+--spec merges a JSON file over it and --dry-run prints exact generated and
+unique counts per template in milliseconds, without generating anything
+(keyword_cardinality.py).
+
+Each run writes <output>.metrics.json with wall and CPU time per phase,
+emitted and unique keywords per Type and write throughput; --profile DIR
+adds cProfile and tracemalloc reports.
+
+Usage: python scripts/generate_keywords.py [--output keyword_list.txt] [--memory-budget MB] [--jobs N]
+                                           [--incremental] [--copy-output keywords.tsv]
+                                           [--spec spec.json] [--dry-run]
+                                           [--weights weights.json] [--max-keywords N]
+                                           [--salons salons.json --centroids centroids.csv] [--radius KM]
+                                           [--index keyword_list.idx] [--sitemap-dir DIR]
+                                           [--shards N] [--shard-dir DIR]
+                                           [--metrics metrics.json] [--profile DIR]
 """
 
+import argparse
+import contextlib
+import cProfile
+import csv
+import functools
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import os
+import pstats
+import re
+import tempfile
+import time
+import tracemalloc
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from string import Formatter
+
 # --- Comprehensive Services List ---
 services = [
     "hair salon", "barber", "nail salon", "spa", "beauty salon", "makeup artist",
@@ -142,80 +209,11 @@ modifiers_suffix = [
 # --- Competitors ---
 competitors = ["Booksy", "Fresha", "Treatwell", "StyleSeat"]
 
-# --- The Generator ---
-keyword_list = set()  # Using a set to avoid duplicates
-
-print("Generating keywords...")
-print(f"Services: {len(services)}")
-print(f"Locations: {len(locations)}")
-print(f"Prefix modifiers: {len(modifiers_prefix)}")
-print(f"Suffix modifiers: {len(modifiers_suffix)}")
-print()
-
-# Type 1: [Service] in [Location]
-print("Type 1: [Service] in [Location]")
-for service in services:
-    for location in locations:
-        keyword_list.add(f"{service} in {location}")
-print(f"  Generated: {len(services) * len(locations)} keywords")
-
-# Type 2: [Modifier] [Service] in [Location]
-print("Type 2: [Modifier] [Service] in [Location]")
-count = 0
-for prefix in modifiers_prefix:
-    for service in services:
-        for location in locations:
-            keyword_list.add(f"{prefix} {service} in {location}")
-            count += 1
-            if count % 10000 == 0:
-                print(f"  Progress: {count} keywords...")
-print(f"  Generated: {count} keywords")
-
-# Type 3: [Service] [Suffix]
-print("Type 3: [Service] [Suffix]")
-for service in services:
-    for suffix in modifiers_suffix:
-        keyword_list.add(f"{service} {suffix}")
-print(f"  Generated: {len(services) * len(modifiers_suffix)} keywords")
-
-# Type 4: [Service] [Location] [Suffix]
-print("Type 4: [Service] [Location] [Suffix]")
-count = 0
-for service in services:
-    for location in locations:
-        for suffix in modifiers_suffix:
-            keyword_list.add(f"{service} {location} {suffix}")
-            count += 1
-            if count % 10000 == 0:
-                print(f"  Progress: {count} keywords...")
-print(f"  Generated: {count} keywords")
-
-# Type 5: [Modifier] [Service] [Location] [Suffix] (High-value combinations)
-print("Type 5: [Modifier] [Service] [Location] [Suffix] (selective)")
+# --- Type 5: High-value modifiers ---
 high_value_prefixes = ["best", "top-rated", "affordable", "cheap", "find a", "book a"]
 high_value_suffixes = ["near me", "prices", "cost", "reviews", "open now", "booking"]
-count = 0
-for prefix in high_value_prefixes:
-    for service in services:
-        for location in locations[:50]:  # Top 50 locations only for this type
-            for suffix in high_value_suffixes:
-                keyword_list.add(f"{prefix} {service} {location} {suffix}")
-                count += 1
-print(f"  Generated: {count} keywords")
-
-# Type 6: Competitor Keywords
-print("Type 6: Competitor Keywords")
-for competitor in competitors:
-    keyword_list.add(f"{competitor} alternative South Africa")
-    keyword_list.add(f"Stylr SA vs {competitor}")
-    keyword_list.add(f"better than {competitor} South Africa")
-    for location in locations[:30]:  # Top 30 locations
-        keyword_list.add(f"{competitor} {location}")
-        keyword_list.add(f"{competitor} alternative {location}")
-print(f"  Generated: {len(competitors) * (3 + 60)} keywords")
-
-# Type 7: Service-specific variations
-print("Type 7: Service-specific variations")
+
+# --- Type 7: Service-specific variations ---
 service_variations = {
     "hair salon": ["hairdresser", "hairstylist", "hair studio", "hair salon near me"],
     "nail salon": ["nail technician", "nail studio", "nail bar", "nail spa"],
@@ -229,54 +227,1531 @@ service_variations = {
     "manicure": ["manicure and pedicure", "nail manicure", "gel manicure", "classic manicure"]
 }
 
+
+# --- Keyword Spec ---
+# Which keywords exist, as data. A dimension is a value list, or is derived
+# "from" another dimension, then narrowed by filters ("include"/"exclude"
+# value lists, "match"/"exclude_match" regexes) and finally a "slice" of its
+# first N values. A Type has a label, an export priority and format strings
+# over dimension names. compile_dimensions() and compile_templates() turn the
+# spec into DIMENSIONS and TEMPLATES (with prebuilt formatters); --spec
+# merges a JSON file over it and --dry-run counts it without generating
+# keywords (keyword_cardinality.py).
+KEYWORD_SPEC = {
+    "dimensions": {
+        "service": {"values": services},
+        "location": {"values": locations},
+        "location_top50": {"from": "location", "slice": 50},  # Top 50 locations only for Type 5
+        "location_top30": {"from": "location", "slice": 30},  # Top 30 locations for competitors
+        "location_top40": {"from": "location", "slice": 40},  # Top 40 locations for variations
+        "prefix": {"values": modifiers_prefix},
+        "suffix": {"values": modifiers_suffix},
+        "high_value_prefix": {"values": high_value_prefixes},
+        "high_value_suffix": {"values": high_value_suffixes},
+        "competitor": {"values": competitors},
+        "variation": {"values": [v for variations in service_variations.values() for v in variations]},
+    },
+    "types": [
+        {"label": "Type 1: [Service] in [Location]", "priority": 1,
+         "templates": ["{service} in {location}"]},
+        {"label": "Type 2: [Modifier] [Service] in [Location]", "priority": 2,
+         "templates": ["{prefix} {service} in {location}"]},
+        {"label": "Type 3: [Service] [Suffix]", "priority": 1,
+         "templates": ["{service} {suffix}"]},
+        {"label": "Type 4: [Service] [Location] [Suffix]", "priority": 2,
+         "templates": ["{service} {location} {suffix}"]},
+        {"label": "Type 5: [Modifier] [Service] [Location] [Suffix] (selective)", "priority": 3,
+         "templates": ["{high_value_prefix} {service} {location_top50} {high_value_suffix}"]},
+        {"label": "Type 6: Competitor Keywords", "priority": 3,
+         "templates": ["{competitor} alternative South Africa", "Stylr SA vs {competitor}",
+                       "better than {competitor} South Africa", "{competitor} {location_top30}",
+                       "{competitor} alternative {location_top30}"]},
+        {"label": "Type 7: Service-specific variations", "priority": 2,
+         "templates": ["{variation} {location_top40}", "{variation} near me {location_top40}"]},
+    ],
+}
+SPEC_FILTERS = ["include", "exclude", "match", "exclude_match"]
+
+
+class SpecError(ValueError):
+    pass
+
+
+def canonical(values):
+    """Drop repeated values, keeping each one at its first position."""
+    return list(dict.fromkeys(values))
+
+
+# Keywords are built from de-duplicated copies of the lists above, so a value
+# listed twice (e.g. "Kalk Bay" or "Bloemfontein" in `locations`) cannot
+# produce the same keyword twice.
+def compile_dimensions(spec_dimensions, overrides=None, sliced=True):
+    """
+    Resolve every dimension of the spec to a canonical value list.
+    `overrides` replaces the values of listed dimensions (e.g. the location
+    catalog's names for "location"); with sliced=False slices are ignored,
+    for weighted selection (--weights) to pick from every value instead.
+    """
+    overrides = overrides or {}
+    resolved = {}
+
+    def resolve(name, derived=()):
+        if name in resolved:
+            return resolved[name]
+        if name in derived:
+            raise SpecError(f"dimension {name} is derived from itself")
+        entry = spec_dimensions.get(name)
+        if entry is None:
+            raise SpecError(f"unknown dimension {name}")
+        unknown = sorted(set(entry) - {"values", "from", "slice", *SPEC_FILTERS})
+        if unknown or ("values" in entry) == ("from" in entry):
+            raise SpecError(f"dimension {name} needs exactly one of values/from, and no {', '.join(unknown)}")
+        if name in overrides:
+            values = canonical(overrides[name])
+        elif "from" in entry:
+            values = list(resolve(entry["from"], derived + (name,)))
+        else:
+            values = canonical(entry["values"])
+        if "include" in entry:
+            values = [value for value in values if value in set(entry["include"])]
+        if "exclude" in entry:
+            values = [value for value in values if value not in set(entry["exclude"])]
+        if "match" in entry:
+            values = [value for value in values if re.search(entry["match"], value)]
+        if "exclude_match" in entry:
+            values = [value for value in values if not re.search(entry["exclude_match"], value)]
+        if sliced and "slice" in entry:
+            values = values[:entry["slice"]]
+        resolved[name] = values
+        return values
+
+    for name in spec_dimensions:
+        resolve(name)
+    return resolved
+
+
+def dimension_root(name, spec_dimensions=None):
+    """The dimension a derived dimension is ultimately taken from: location_top50 -> location."""
+    spec_dimensions = spec_dimensions or KEYWORD_SPEC["dimensions"]
+    while "from" in spec_dimensions.get(name, {}):
+        name = spec_dimensions[name]["from"]
+    return name
+
+
+DIMENSIONS = compile_dimensions(KEYWORD_SPEC["dimensions"])
+
+
+# --- Keyword Templates ---
+class Template:
+    """
+    One keyword format over a fixed list of dimensions.
+
+    A keyword is identified by its index into the flattened cross product of
+    the template's dimensions (row-major, last field fastest), so the whole
+    template can be enumerated as a plain range of integers and only turned
+    into a string by render().
+    """
+
+    def __init__(self, type_number, fmt, dimensions=DIMENSIONS):
+        parsed = list(Formatter().parse(fmt))
+        fields = [name for _, name, _, _ in parsed if name]
+        self.type_number = type_number
+        self.fmt = fmt
+        self.fields = fields
+        self.literals = "".join(literal for literal, _, _, _ in parsed)
+        # Literal text before each field, plus the trailing literal
+        self.parts = [literal for literal, _, _, _ in parsed]
+        if parsed[-1][1]:
+            self.parts.append("")
+        self.dims = [dimensions[name] for name in fields]
+        self._value_sets = None
+        self.sizes = [len(dim) for dim in self.dims]
+        self.size = math.prod(self.sizes)
+        # Shard on the location field when there is one, else the first field
+        self.shard_axis = next((i for i, name in enumerate(fields) if name.startswith("location")), 0)
+        self._format = re.sub(r"\{\w+\}", "{}", fmt).format
+        self._format_tagged = (re.sub(r"\{\w+\}", "{}", fmt) + f"\t{type_number}").format
+        self._reversed = list(zip(reversed(self.dims), reversed(self.sizes)))
+
+    def ranges(self, shard=0, shards=1, supply=None):
+        """
+        Yield ranges of cross-product indices that belong to one shard. Each
+        range fixes every field up to the shard axis; with a supply map
+        (see SUPPLY) ranges for a service and location without salon supply
+        are skipped. When the shard axis is the last field, an unpruned
+        shard's indices under one outer index are a single range stepping by
+        `shards`, not one range per keyword.
+        """
+        if not self.fields:
+            # A literal-only template ("Stylr SA reviews") is one keyword, in shard 0
+            if shard == 0:
+                yield range(1)
+            return
+        axis = self.shard_axis
+        outer = math.prod(self.sizes[:axis])
+        inner = math.prod(self.sizes[axis + 1:])
+        axis_size = self.sizes[axis]
+        groups = self.supply_groups(supply)
+        for i in range(outer):
+            kept = None if groups is None else groups[2][(i // groups[0]) % groups[1]]
+            if kept is None and inner == 1:
+                yield range(i * axis_size + shard, (i + 1) * axis_size, shards)
+                continue
+            for j in range(shard, axis_size, shards):
+                if kept is None or kept[j]:
+                    start = (i * axis_size + j) * inner
+                    yield range(start, start + inner)
+
+    def supplied(self, supply):
+        """Predicate on (outer index, location position) for ranges(), or None if nothing is pruned."""
+        groups = self.supply_groups(supply)
+        if groups is None:
+            return None
+        divisor, count, kept = groups
+        return lambda outer, position: kept[(outer // divisor) % count][position]
+
+    def supply_groups(self, supply):
+        """
+        What geo pruning keeps, as (divisor, count, kept), or None if nothing
+        is pruned: an outer index fixes service position
+        (outer // divisor) % count, and kept[service][location position]
+        says whether that range is kept. Locations missing from supply are
+        always kept.
+        """
+        if not supply or not self.fields or not self.fields[self.shard_axis].startswith("location"):
+            return None
+        axis = self.shard_axis
+        locations = self.dims[axis]
+        service_field = next((i for i, name in enumerate(self.fields[:axis]) if name in ("service", "variation")),
+                             None)
+        if service_field is None:
+            # No service before the location (e.g. competitor pages): keep locations with any supply
+            return 1, 1, [[supply.get(location) != set() for location in locations]]
+        services = self.dims[service_field]
+        if self.fields[service_field] == "variation":
+            services = [VARIATION_BASE.get(variation) for variation in services]
+        kept = [[location not in supply or service in supply[location] for location in locations]
+                for service in services]
+        return math.prod(self.sizes[service_field + 1:axis]), self.sizes[service_field], kept
+
+    def values(self, index):
+        values = []
+        for dim, size in self._reversed:
+            index, position = divmod(index, size)
+            values.append(dim[position])
+        values.reverse()
+        return values
+
+    def render(self, index):
+        return self._format(*self.values(index))
+
+    def render_tagged(self, index):
+        """The keyword followed by a tab and the template's Type."""
+        return self._format_tagged(*self.values(index))
+
+    def render_values(self, values):
+        return self._format(*values)
+
+    def parse(self, keyword):
+        """Split keyword back into field values on the literal text, or None if this template can't produce it."""
+        if self._value_sets is None:
+            self._value_sets = [set(dim) for dim in self.dims]
+        return self._match(keyword, 0, 0)
+
+    def contains(self, keyword):
+        return self.parse(keyword) is not None
+
+    def _match(self, keyword, pos, field):
+        literal = self.parts[field]
+        if not keyword.startswith(literal, pos):
+            return None
+        pos += len(literal)
+        if field == len(self.fields):
+            return [] if pos == len(keyword) else None
+        following = self.parts[field + 1]
+        if field + 1 == len(self.fields):
+            ends = [len(keyword) - len(following)] if keyword.endswith(following) else []
+        elif following:
+            ends = [i for i in range(pos + 1, len(keyword)) if keyword.startswith(following, i)]
+        else:
+            ends = range(pos + 1, len(keyword))
+        for end in ends:
+            if keyword[pos:end] in self._value_sets[field]:
+                rest = self._match(keyword, end, field + 1)
+                if rest is not None:
+                    return [keyword[pos:end]] + rest
+        return None
+
+
+def compile_templates(spec, dimensions=DIMENSIONS):
+    """One Template per format string, numbered by the Type's position in the spec."""
+    try:
+        return [Template(type_number, fmt, dimensions)
+                for type_number, keyword_type in enumerate(spec["types"], start=1)
+                for fmt in keyword_type["templates"]]
+    except KeyError as error:
+        raise SpecError(f"template uses unknown dimension {error}") from None
+
+
+TEMPLATES = compile_templates(KEYWORD_SPEC)
+KEYWORD_TYPES = [keyword_type["label"] for keyword_type in KEYWORD_SPEC["types"]]
+# seo_keywords.priority per Type; broad head terms rank above modifier-heavy long-tail keywords
+TYPE_PRIORITY = {n: keyword_type["priority"] for n, keyword_type in enumerate(KEYWORD_SPEC["types"], start=1)}
+
+
+def set_locations(values, sliced=True):
+    """Swap in a different location list (e.g. from the location catalog) and rebuild the templates."""
+    DIMENSIONS.update(compile_dimensions(KEYWORD_SPEC["dimensions"], {"location": values}, sliced))
+    TEMPLATES[:] = compile_templates(KEYWORD_SPEC)
+
+
+def load_spec(path):
+    """
+    KEYWORD_SPEC with a JSON file merged over it: its "dimensions" replace
+    the same-named ones and its "types", if given, replace every Type.
+    """
+    with open(path, encoding="utf-8") as f:
+        override = json.load(f)
+    unknown = sorted(set(override) - {"dimensions", "types"})
+    if unknown:
+        raise SpecError(f"unknown spec key(s) {', '.join(unknown)}")
+    return {
+        "dimensions": {**KEYWORD_SPEC["dimensions"], **override.get("dimensions", {})},
+        "types": override.get("types", KEYWORD_SPEC["types"]),
+    }
+
+
+def set_spec(spec):
+    """Compile spec and make it the module's KEYWORD_SPEC, DIMENSIONS, TEMPLATES and KEYWORD_TYPES."""
+    spec = {"dimensions": dict(spec["dimensions"]), "types": list(spec["types"])}  # spec may be KEYWORD_SPEC itself
+    # Checked first, so a Type missing its templates isn't reported as an unknown dimension
+    for keyword_type in spec["types"]:
+        if not {"label", "priority", "templates"} <= set(keyword_type):
+            raise SpecError(f"Type {keyword_type.get('label', '?')} needs a label, priority and templates")
+    dimensions = compile_dimensions(spec["dimensions"])
+    templates = compile_templates(spec, dimensions)
+    KEYWORD_SPEC.clear()
+    KEYWORD_SPEC.update(spec)
+    DIMENSIONS.clear()
+    DIMENSIONS.update(dimensions)
+    TEMPLATES[:] = [Template(t.type_number, t.fmt) for t in templates]
+    KEYWORD_TYPES[:] = [keyword_type["label"] for keyword_type in spec["types"]]
+    TYPE_PRIORITY.clear()
+    TYPE_PRIORITY.update((n, keyword_type["priority"]) for n, keyword_type in enumerate(spec["types"], start=1))
+
+
+# --- Keyword Analysis ---
+# Distribution counts come straight from the template dimensions: a template
+# has size - prod(non-matching values per field) keywords with at least one
+# matching field, so no keyword string is ever scanned. Counts are over the
+# generated keywords, before identical strings from different templates merge.
+VARIATION_BASE = {}
 for base_service, variations in service_variations.items():
     for variation in variations:
-        for location in locations[:40]:  # Top 40 locations
-            keyword_list.add(f"{variation} {location}")
-            keyword_list.add(f"{variation} near me {location}")
-print(f"  Generated service variations")
-
-# --- Print Results ---
-print()
-print("=" * 60)
-print(f"Total Unique Keywords Generated: {len(keyword_list)}")
-print("=" * 60)
-print()
-
-# --- Save to file ---
-output_file = "keyword_list.txt"
-print(f"Saving keywords to {output_file}...")
-with open(output_file, "w", encoding="utf-8") as f:
-    for keyword in sorted(keyword_list):
-        f.write(f"{keyword}\n")
-
-print(f"✅ Keyword list saved to {output_file}")
-print()
-
-# --- Generate keyword analysis ---
-print("Keyword Analysis:")
-print(f"  - Total keywords: {len(keyword_list):,}")
-print(f"  - Average length: {sum(len(k) for k in keyword_list) / len(keyword_list):.1f} characters")
-print()
-
-# Count keywords by type
-location_keywords = sum(1 for k in keyword_list if any(loc in k for loc in locations[:10]))
-service_keywords = sum(1 for k in keyword_list if any(serv in k.lower() for serv in services[:10]))
-near_me_keywords = sum(1 for k in keyword_list if "near me" in k.lower())
-price_keywords = sum(1 for k in keyword_list if "price" in k.lower() or "cost" in k.lower())
-
-print("Keyword Distribution:")
-print(f"  - Location-based: {location_keywords:,}")
-print(f"  - Service-based: {service_keywords:,}")
-print(f"  - 'Near me' keywords: {near_me_keywords:,}")
-print(f"  - Price-related: {price_keywords:,}")
-print()
-
-print("✅ Keyword generation complete!")
-print()
-print("Next steps:")
-print("1. Review keyword_list.txt")
-print("2. Use these keywords to create content pages")
-print("3. Update your site's metadata with relevant keywords")
-print("4. Submit sitemap to Google Search Console")
+        VARIATION_BASE.setdefault(variation, base_service)
+
+
+def _mentions(*words):
+    return lambda field, text: any(word in text.lower() for word in words)
+
+
+ANALYSIS_FACETS = [
+    ("Location-based", lambda field, text: field.startswith("location") and text in DIMENSIONS["location"][:10]),
+    ("Service-based", lambda field, text: (field == "service" and text in DIMENSIONS["service"][:10])
+                                          or (field == "variation"
+                                              and VARIATION_BASE.get(text) in DIMENSIONS["service"][:10])),
+    ("'Near me' keywords", _mentions("near me")),
+    ("Price-related", _mentions("price", "cost")),
+]
+
+
+def count_matching(template, predicate):
+    """Number of the template's keywords with a field value (or literal text) matching predicate(field, text)."""
+    if predicate("", template.literals):
+        return template.size
+    misses = math.prod(
+        sum(1 for value in dim if not predicate(field, value))
+        for field, dim in zip(template.fields, template.dims)
+    )
+    return template.size - misses
+
+
+def count_matching_supplied(template, predicate, divisor, count, kept):
+    """
+    count_matching over the ranges geo pruning keeps (see
+    Template.supply_groups). Ranges fix every field up to the location, so
+    each kept range has either all or (inner size - inner misses) matches,
+    and kept ranges are tallied per service instead of per keyword.
+    """
+    axis = template.shard_axis
+    outer_fields, outer_dims = template.fields[:axis], template.dims[:axis]
+    inner = math.prod(template.sizes[axis + 1:])
+    if predicate("", template.literals):
+        inner_misses = 0
+        location_matches = [True] * template.sizes[axis]
+    else:
+        inner_misses = math.prod(sum(1 for value in dim if not predicate(field, value))
+                                 for field, dim in zip(template.fields[axis + 1:], template.dims[axis + 1:]))
+        location_matches = [predicate(template.fields[axis], value) for value in template.dims[axis]]
+    kept_total = [sum(row) for row in kept]
+    kept_matching = [sum(1 for keep, match in zip(row, location_matches) if keep and match) for row in kept]
+    total = 0
+    # product() enumerates the outer fields in cross-product (row-major) order
+    for outer, values in enumerate(itertools.product(*outer_dims)):
+        service = (outer // divisor) % count
+        if any(predicate(field, value) for field, value in zip(outer_fields, values)):
+            total += kept_total[service] * inner
+        else:
+            total += (kept_matching[service] * inner
+                      + (kept_total[service] - kept_matching[service]) * (inner - inner_misses))
+    return total
+
+
+def count_matching_codes(codes, predicate):
+    """count_matching for an explicit set of keyword codes, such as a weighted selection."""
+    stride = len(TEMPLATES)
+    matches = [None if predicate("", t.literals)
+               else [{value for value in dim if predicate(field, value)} for field, dim in zip(t.fields, t.dims)]
+               for t in TEMPLATES]
+    count = 0
+    for code in codes:
+        index, template_id = divmod(code, stride)
+        fields = matches[template_id]
+        if fields is None or any(value in field for value, field in
+                                 zip(TEMPLATES[template_id].values(index), fields)):
+            count += 1
+    return count
+
+
+def keyword_distribution(templates=TEMPLATES):
+    """
+    Facet counts; Types narrowed by weighted selection are counted over the
+    codes they emit, and templates narrowed by geo pruning over the ranges
+    they keep.
+    """
+    supplied = [template.supply_groups(SUPPLY) for template in templates]
+    distribution = {}
+    for label, predicate in ANALYSIS_FACETS:
+        count = 0
+        for template, groups in zip(templates, supplied):
+            if template.type_number in SELECTED:
+                continue
+            count += count_matching(template, predicate) if groups is None \
+                else count_matching_supplied(template, predicate, *groups)
+        for type_number in sorted(SELECTED):
+            count += count_matching_codes(SELECTED[type_number], predicate)
+        distribution[label] = count
+    return distribution
+
+
+# --- Keyword Codes ---
+# A keyword travels through the pipeline as one integer,
+# code = cross-product index * len(TEMPLATES) + template id, and a whole
+# template shard is a range of codes. Codes are unique by construction
+# because the dimensions are canonical; strings only exist while a sorted
+# run is being written.
+#
+# SELECTED maps a Type to the sorted array of codes weighted selection kept
+# for it (see select_codes); Types not in it are enumerated in full. SUPPLY
+# maps a location to the services offered near it (salon_supply.py); when it
+# is set, ranges for unsupplied service/location pairs are never emitted.
+SELECTED = {}
+SUPPLY = {}
+
+
+def type_code_ranges(type_number, shard=0, shards=1):
+    """
+    Yield ranges of keyword codes for one shard of one keyword Type.
+    Adjacent index ranges are merged, so a template whose location is its
+    last field does not become one range per keyword.
+    """
+    if type_number in SELECTED:
+        yield SELECTED[type_number][shard::shards]
+        return
+    stride = len(TEMPLATES)
+    for template_id, template in enumerate(TEMPLATES):
+        if template.type_number != type_number:
+            continue
+        start = stop = None
+        for indices in template.ranges(shard, shards, SUPPLY):
+            if indices.step == 1 and indices.start == stop:
+                stop = indices.stop
+                continue
+            if start is not None:
+                yield range(start * stride + template_id, stop * stride + template_id, stride)
+                start = stop = None
+            if indices.step == 1:
+                start, stop = indices.start, indices.stop
+            else:
+                yield range(indices.start * stride + template_id, indices.stop * stride + template_id,
+                            indices.step * stride)
+        if start is not None:
+            yield range(start * stride + template_id, stop * stride + template_id, stride)
+
+
+def render_code(code):
+    index, template_id = divmod(code, len(TEMPLATES))
+    return TEMPLATES[template_id].render(index)
+
+
+def render_tagged(code):
+    """The keyword, a tab and its Type, so the sorted stream can tell which Type each keyword came from."""
+    index, template_id = divmod(code, len(TEMPLATES))
+    return TEMPLATES[template_id].render_tagged(index)
+
+
+# --- Weighted Selection ---
+# With --weights, Types 5-7 rank every location instead of taking the first
+# 30-50 in list order: each Type keeps as many keywords as its slices used to
+# give, chosen by score. --max-keywords then caps the whole corpus to a page
+# budget the same way. Candidates stream through bounded heaps, so memory
+# grows with the number of keywords kept, never with the cross product.
+WEIGHTED_DIMENSIONS = ["service", "location", "prefix", "suffix", "high_value_prefix", "high_value_suffix",
+                       "competitor", "variation"]
+
+
+def load_weights(path):
+    """
+    Read per-value weights (population, salon count, ...) from JSON,
+    {"location": {"Johannesburg": 5635127, ...}, "service": {...}}, or from a
+    CSV file with dimension,value,weight columns.
+    """
+    if path.endswith(".csv"):
+        weights = {}
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                weights.setdefault(row["dimension"], {})[row["value"]] = float(row["weight"])
+    else:
+        with open(path, encoding="utf-8") as f:
+            weights = json.load(f)
+    unknown = sorted(set(weights) - set(WEIGHTED_DIMENSIONS))
+    if unknown:
+        raise ValueError(f"unknown dimension(s) {', '.join(unknown)}; expected {', '.join(WEIGHTED_DIMENSIONS)}")
+    for name, table in weights.items():
+        negative = [value for value, weight in table.items() if weight < 0]
+        if negative:
+            raise ValueError(f"negative {name} weight for {negative[0]!r}")
+    return weights
+
+
+class Scorer:
+    """
+    Keyword scores from per-value weights: the product of the weights of a
+    keyword's fields.
+
+    Each weighted dimension is scaled to a mean weight of 1, so a keyword
+    without a location ranks like one in an average location. Values missing
+    from a weighted dimension weigh 0 and fields of unweighted dimensions
+    weigh 1. Variations without weights of their own take their base
+    service's weight.
+    """
+
+    def __init__(self, weights):
+        self.weights = weights
+
+    def field_weights(self, field, dim):
+        name = dimension_root(field)
+        table = self.weights.get(name)
+        if table is None and name == "variation" and "service" in self.weights:
+            table = {value: self.weights["service"].get(VARIATION_BASE.get(value), 0) for value in dim}
+        if table is None or not dim:
+            return [1.0] * len(dim)
+        values = [float(table.get(value, 0)) for value in dim]
+        mean = sum(values) / len(values)
+        return [value / mean for value in values] if mean else [1.0] * len(dim)
+
+    def unmatched(self):
+        """Weighted values that are not in their dimension, usually typos."""
+        return {name: sorted(set(table) - set(DIMENSIONS[name])) for name, table in self.weights.items()
+                if set(table) - set(DIMENSIONS[name])}
+
+
+class TopK:
+    """Bounded min-heap of the k best (score, code) pairs; on equal scores the lower code wins."""
+
+    def __init__(self, k):
+        self.k = k
+        self.heap = []
+
+    def floor(self):
+        """The score a candidate must beat once the heap is full, else None."""
+        return self.heap[0][0] if len(self.heap) >= self.k else None
+
+    def push(self, score, code):
+        item = (score, -code)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, item)
+        elif item > self.heap[0]:
+            heapq.heapreplace(self.heap, item)
+
+    def scored_codes(self):
+        return ((score, -negated) for score, negated in self.heap)
+
+
+def _scan_template(template_id, scorer, top):
+    """
+    Push one template's keywords into `top`. Keywords are visited in blocks
+    that share every field but the last, and a block whose best possible
+    score cannot beat the heap's floor is skipped whole, as are keywords
+    geo pruning drops (see Template.ranges).
+    """
+    template = TEMPLATES[template_id]
+    if not template.size:
+        return
+    stride = len(TEMPLATES)
+    if not template.fields:
+        top.push(1.0, template_id)  # A literal-only keyword weighs like an average one
+        return
+    weights = [scorer.field_weights(field, dim) for field, dim in zip(template.fields, template.dims)]
+    inner = weights[-1]
+    inner_best = max(inner)
+    supplied = template.supplied(SUPPLY)
+    axis = template.shard_axis
+    last = len(template.fields) - 1
+    # Blocks fix the location unless it is the last field, then it varies within the block
+    below_axis = math.prod(template.sizes[axis + 1:last])
+    for block, outer_weights in enumerate(itertools.product(*weights[:-1])):
+        outer = math.prod(outer_weights)
+        floor = top.floor()
+        if floor is not None and outer * inner_best < floor:
+            continue
+        if supplied and axis < last and not supplied(*divmod(block // below_axis, template.sizes[axis])):
+            continue
+        start = block * len(inner)
+        for position, weight in enumerate(inner):
+            if supplied and axis == last and not supplied(block, position):
+                continue
+            top.push(outer * weight, (start + position) * stride + template_id)
+
+
+def selective_budgets():
+    """Keywords per Type from the templates that use a sliced dimension (location_top50, ...), as currently sliced."""
+    sliced = {name for name, entry in KEYWORD_SPEC["dimensions"].items() if "slice" in entry}
+    budgets = {}
+    for template in TEMPLATES:
+        if sliced.intersection(template.fields):
+            budgets[template.type_number] = 0
+    for template in TEMPLATES:
+        if template.type_number in budgets:
+            budgets[template.type_number] += template.size
+    return budgets
+
+
+def select_codes(scorer, budgets, max_keywords=None):
+    """
+    Return {Type: sorted array of codes} for the Types weighted selection
+    narrows: the best budgets[Type] keywords of each budgeted Type and, with
+    max_keywords, the best max_keywords keywords overall (which covers every
+    Type).
+    """
+    stride = len(TEMPLATES)
+    overall = TopK(max_keywords) if max_keywords is not None else None
+    selected = {}
+    for type_number in range(1, len(KEYWORD_TYPES) + 1):
+        budget = budgets.get(type_number)
+        if budget is None and overall is None:
+            continue
+        top = TopK(budget) if budget is not None else overall
+        for template_id, template in enumerate(TEMPLATES):
+            if template.type_number == type_number:
+                _scan_template(template_id, scorer, top)
+        if top is overall:
+            continue
+        if overall is None:
+            selected[type_number] = array("Q", sorted(code for _, code in top.scored_codes()))
+        else:
+            for score, code in top.scored_codes():
+                overall.push(score, code)
+    if overall is not None:
+        selected = {type_number: array("Q") for type_number in range(1, len(KEYWORD_TYPES) + 1)}
+        for code in sorted(code for _, code in overall.scored_codes()):
+            selected[TEMPLATES[code % stride].type_number].append(code)
+    return selected
+
+
+# --- Database Export ---
+# Rows for the seo_keywords table, in PostgreSQL COPY text format. Rows start
+# with the keyword and a tab, which sorts below every printable character, so
+# sorting rows sorts keywords and rows for the same keyword end up adjacent.
+EXPORT_COLUMNS = ["keyword", "slug", "category", "priority", "service", "location", "keyword_type"]
+COPY_NULL = "\\N"
+
+# KeywordCategory values from backend/src/seo/keyword.service.ts, first match wins
+CATEGORY_RULES = [
+    ("NAILS", ("nail", "manicure", "pedicure")),
+    ("LASHES", ("lash",)),
+    ("BROWS", ("brow", "threading", "microblading")),
+    ("MASSAGE", ("massage", "reflexology")),
+    ("MAKEUP", ("makeup",)),
+    ("MENS_GROOMING", ("barber", "men's", "shave", "beard", "fade")),
+    ("TATTOO", ("tattoo",)),
+    ("AESTHETICS", ("facial", "peel", "skin", "acne", "derma", "anti-aging", "cellulite")),
+    ("SPA", ("spa", "wax", "body")),
+    ("HAIR", ("hair", "braid", "twist", "cornrow", "dreadlock", "locs", "weave", "blowout",
+              "balayage", "ombre", "highlights", "keratin", "olaplex")),
+]
+
+SLUG_STRIP = re.compile(r"[^a-z0-9_\s-]+")
+SLUG_DASHES = re.compile(r"--+")
+
+
+def slugify(keyword):
+    """Same result as generateSlug() in backend/scripts/import-seo-keywords.ts."""
+    slug = "-".join(SLUG_STRIP.sub("", keyword.lower()).split())
+    if "--" in slug:
+        slug = SLUG_DASHES.sub("-", slug)
+    return slug.strip("-")
+
+
+@functools.lru_cache(maxsize=None)
+def keyword_category(service):
+    if service:
+        lowered = service.lower()
+        for category, words in CATEGORY_RULES:
+            if any(word in lowered for word in words):
+                return category
+    return "GENERAL"
+
+
+def _copy_escape(value):
+    if value is None:
+        return COPY_NULL
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def keyword_row(template, values):
+    """One COPY text row (without newline) for a keyword of template built from values."""
+    fields = dict(zip(template.fields, values))
+    service = fields.get("service") or VARIATION_BASE.get(fields.get("variation"))
+    location = next((value for field, value in fields.items() if field.startswith("location")), None)
+    keyword = template.render_values(values)
+    return "\t".join(map(_copy_escape, [
+        keyword, slugify(keyword), keyword_category(service), str(TYPE_PRIORITY[template.type_number]),
+        service, location, str(template.type_number),
+    ]))
+
+
+def render_row(code):
+    index, template_id = divmod(code, len(TEMPLATES))
+    template = TEMPLATES[template_id]
+    return keyword_row(template, template.values(index))
+
+
+def describe_keyword(keyword):
+    """The export row for an already rendered keyword, recovered by parsing it against the templates."""
+    rows = [(t.type_number, keyword_row(t, values)) for t in TEMPLATES if (values := t.parse(keyword)) is not None]
+    # The row a full build keeps: the lowest Type's, then the first in sort order (see _count_types)
+    return min(rows)[1] if rows else None
+
+
+def _export_rows(sorted_rows, export_file, export_format):
+    """Write sorted rows to export_file (one per keyword) and yield their keywords."""
+    previous = None
+    with open(export_file, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n") if export_format == "csv" else None
+        if writer:
+            writer.writerow(EXPORT_COLUMNS)
+        for row in sorted_rows:
+            keyword = row[:row.index("\t")]
+            if keyword == previous:
+                continue
+            previous = keyword
+            if writer:
+                writer.writerow(None if value == COPY_NULL else value for value in row.split("\t"))
+            else:
+                f.write(f"{row}\n")
+            yield keyword
+
+
+def generate_codes(emitted):
+    """Chain every Type's code ranges, counting the codes emitted per Type into `emitted`."""
+    for type_number in range(1, len(KEYWORD_TYPES) + 1):
+        for codes in type_code_ranges(type_number):
+            emitted[type_number] += len(codes)
+            yield codes
+
+
+# --- External Merge Sort ---
+# Rough cost of one buffered keyword: 8 bytes for its code plus, while its run
+# is being sorted, the rendered str object and its slot in the sort list.
+BYTES_PER_KEYWORD = 8 + 96 + 8
+MAX_MERGE_FANIN = 64
+
+
+def _write_run(keywords, tmp_dir):
+    """Write already sorted keywords to a new run file and return its path."""
+    fd, path = tempfile.mkstemp(suffix=".run", dir=tmp_dir)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        for keyword in keywords:
+            f.write(f"{keyword}\n")
+    return path
+
+
+def read_lines(path):
+    """Yield the lines of a keyword list, run or row file, without their newlines."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            yield line[:-1]
+
+
+def _unique(sorted_keywords):
+    """Drop adjacent duplicates from a sorted stream."""
+    previous = None
+    for keyword in sorted_keywords:
+        if keyword != previous:
+            yield keyword
+            previous = keyword
+
+
+def _sorted_run(items, render):
+    """Render a buffer and sort it; equal strings from different templates collapse here."""
+    return _unique(sorted(map(render, items) if render else items))
+
+
+def _merge_runs(paths, tmp_dir):
+    """K-way merge run files, collapsing in passes if there are too many to open at once."""
+    while len(paths) > MAX_MERGE_FANIN:
+        merged = []
+        for i in range(0, len(paths), MAX_MERGE_FANIN):
+            group = paths[i:i + MAX_MERGE_FANIN]
+            merged.append(_write_run(_unique(heapq.merge(*map(read_lines, group))), tmp_dir))
+            for path in group:
+                os.remove(path)
+        paths = merged
+    yield from _unique(heapq.merge(*map(read_lines, paths)))
+
+
+def external_sort_unique(chunks, memory_budget, tmp_dir=None, render=render_code):
+    """
+    Yield the unique keywords for a stream of chunks, in sorted order.
+
+    Chunks are ranges of keyword codes (or, with render=None, lists of
+    ready-made strings). Items are buffered, in a compact array for codes,
+    until the buffer reaches memory_budget bytes (see BYTES_PER_KEYWORD), then
+    rendered, sorted and spilled to a run file. The runs are k-way merged at
+    the end, so memory stays bounded no matter how many keywords the templates
+    produce. If everything fits in one buffer, nothing touches the disk.
+    """
+    run_size = max(1, memory_budget // BYTES_PER_KEYWORD)
+    new_buffer = (lambda: array("Q")) if render else list
+    with tempfile.TemporaryDirectory(prefix="keywords-", dir=tmp_dir) as run_dir:
+        runs = []
+        buffer = new_buffer()
+        for items in chunks:
+            while items:
+                room = run_size - len(buffer)
+                buffer.extend(items[:room])
+                items = items[room:]
+                if len(buffer) >= run_size:
+                    runs.append(_write_run(_sorted_run(buffer, render), run_dir))
+                    buffer = new_buffer()
+
+        if not runs:
+            yield from _sorted_run(buffer, render)
+            return
+        if buffer:
+            runs.append(_write_run(_sorted_run(buffer, render), run_dir))
+        del buffer
+        yield from _merge_runs(runs, run_dir)
+
+
+# --- Parallel Mode ---
+def _init_worker(spec, dimensions, selected, supply):
+    """Pool initializer: give the worker the parent's spec, dimensions, weighted selection and geo pruning."""
+    # A forked worker receives the parent's own objects, and set_spec
+    # rebuilds DIMENSIONS in place; copy the dimensions before it runs
+    dimensions = dict(dimensions)
+    set_spec(spec)
+    DIMENSIONS.update(dimensions)
+    TEMPLATES[:] = compile_templates(KEYWORD_SPEC)
+    SELECTED.update(selected)
+    SUPPLY.update(supply)
+
+
+def _generate_shard(type_number, shard, shards, memory_budget, run_dir, render):
+    """Worker: sort and dedup one shard of one Type into a run file."""
+    emitted = 0
+
+    def counted():
+        # Streamed, not listed: ranges outside the sort buffer are not covered by memory_budget
+        nonlocal emitted
+        for codes in type_code_ranges(type_number, shard, shards):
+            emitted += len(codes)
+            yield codes
+
+    path = _write_run(external_sort_unique(counted(), memory_budget, run_dir, render), run_dir)
+    return type_number, emitted, path
+
+
+def parallel_sort_unique(jobs, memory_budget, emitted, tmp_dir=None, render=render_code):
+    """
+    Yield the unique keywords in sorted order, generating them on a process pool.
+
+    Every Type is split into `jobs` shards along its location dimension (or
+    the first dimension of templates without one, e.g. services for Type 3).
+    Each worker dedups and sorts its shard with external_sort_unique and
+    writes it as a run; the runs are then k-way merged, which gives exactly
+    the same output as a serial run. Codes emitted per Type are counted into
+    `emitted`.
+    """
+    with tempfile.TemporaryDirectory(prefix="keywords-", dir=tmp_dir) as run_dir:
+        worker_budget = max(1, memory_budget // jobs)
+        runs = []
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(KEYWORD_SPEC, DIMENSIONS, SELECTED, SUPPLY)) as pool:
+            futures = [
+                pool.submit(_generate_shard, type_number, shard, jobs, worker_budget, run_dir, render)
+                for type_number in emitted
+                for shard in range(jobs)
+            ]
+            for future in futures:
+                type_number, count, path = future.result()
+                emitted[type_number] += count
+                runs.append(path)
+
+        yield from _merge_runs(runs, run_dir)
+
+
+# --- Incremental Mode ---
+# The manifest records every dimension (values plus a hash) and template next
+# to the output, so a rerun can diff the inputs and only enumerate the slice
+# of each cross product that involves added or removed values.
+MANIFEST_VERSION = 1
+DELTA_CHUNK = 10000
+
+
+def _digest(values):
+    hasher = hashlib.sha256()
+    for value in values:
+        hasher.update(value.encode("utf-8"))
+        hasher.update(b"\n")
+    return hasher.hexdigest()
+
+
+def _file_digest(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+NO_PRUNING = {"weights": None, "max_keywords": None, "supply": None}
+
+
+def pruning_inputs(weights_file=None, max_keywords=None):
+    """
+    What narrowed the output beyond the templates: the weights file and page
+    budget of a weighted selection (--weights), and the salon supply map
+    (--salons).
+    """
+    supply = None
+    if SUPPLY:
+        supply = _digest(f"{location}\t{';'.join(sorted(services))}" for location, services in sorted(SUPPLY.items()))
+    return {"weights": _file_digest(weights_file) if weights_file else None,
+            "max_keywords": max_keywords, "supply": supply}
+
+
+def build_manifest(output_file, count, pruning=NO_PRUNING):
+    return {
+        "version": MANIFEST_VERSION,
+        "output": {"keywords": count, "sha256": _file_digest(output_file)},
+        "pruning": pruning,
+        "dimensions": {
+            name: {"sha256": _digest(values), "values": values}
+            for name, values in DIMENSIONS.items()
+        },
+        "templates": [
+            {"type": t.type_number, "format": t.fmt, "sha256": _digest([str(t.type_number), t.fmt])}
+            for t in TEMPLATES
+        ],
+    }
+
+
+def load_manifest(manifest_file, output_file, pruning=NO_PRUNING):
+    """Return the previous run's manifest, or None with a reason if it cannot be trusted."""
+    if not os.path.exists(manifest_file):
+        return None, "no manifest from a previous run"
+    if not os.path.exists(output_file):
+        return None, f"{output_file} is missing"
+    with open(manifest_file, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None, "manifest version changed"
+    if manifest["output"]["sha256"] != _file_digest(output_file):
+        return None, f"{output_file} was modified since the manifest was written"
+    # Manifests from before pruning was recorded are from unpruned runs
+    previous = {**NO_PRUNING, **manifest.get("pruning", {})}
+    if previous != pruning:
+        changed = ", ".join(name for name in pruning if previous[name] != pruning[name])
+        return None, f"the previous output was narrowed differently ({changed})"
+    return manifest, None
+
+
+def _cross_product_difference(dims, other_dims):
+    """
+    Yield the value tuples in the cross product of dims that are not in the
+    cross product of other_dims, without enumerating the shared part.
+
+    Each such tuple has a first field whose value is new; the fields before
+    it hold kept values and the fields after it anything, which partitions
+    the difference into disjoint products.
+    """
+    other_sets = [set(other) for other in other_dims]
+    kept = [[v for v in dim if v in other] for dim, other in zip(dims, other_sets)]
+    new = [[v for v in dim if v not in other] for dim, other in zip(dims, other_sets)]
+    for i, values in enumerate(new):
+        if values:
+            yield from itertools.product(*kept[:i], values, *dims[i + 1:])
+
+
+def _chunks(keywords):
+    while chunk := list(itertools.islice(keywords, DELTA_CHUNK)):
+        yield chunk
+
+
+def _delta_candidates(templates, other_templates):
+    """Keywords the templates produce that the matching other_templates do not."""
+    others = {t.fmt: t for t in other_templates}
+    for template in templates:
+        other = others.get(template.fmt)
+        if other is None:
+            tuples = itertools.product(*template.dims)
+        elif other.dims == template.dims:
+            continue
+        else:
+            tuples = _cross_product_difference(template.dims, other.dims)
+        yield from _chunks(map(template.render_values, tuples))
+
+
+def _apply_delta(old_keywords, added, removed):
+    """Merge sorted streams: old keywords minus removed, plus added."""
+    removed = iter(removed)
+    pending = next(removed, None)
+
+    def kept():
+        nonlocal pending
+        for keyword in old_keywords:
+            while pending is not None and pending < keyword:
+                pending = next(removed, None)
+            if keyword != pending:
+                yield keyword
+
+    return _unique(heapq.merge(kept(), added))
+
+
+def incremental_sort_unique(manifest, output_file, memory_budget, tmp_dir=None, export=None):
+    """
+    Yield the new sorted keyword list by patching the previous output.
+
+    Only keywords involving added or removed dimension values (or added or
+    removed templates) are generated. A candidate is dropped if another
+    template still produces it (removals) or already produced it (additions),
+    so the delta is exact. The added and removed keywords are also written to
+    delta files next to the output, and, given export=(path, format), the
+    added keywords are exported as database rows.
+    """
+    old_dimensions = {name: entry["values"] for name, entry in manifest["dimensions"].items()}
+    old_templates = [Template(t["type"], t["format"], old_dimensions) for t in manifest["templates"]]
+
+    changed = [name for name, values in DIMENSIONS.items()
+               if manifest["dimensions"].get(name, {}).get("sha256") != _digest(values)]
+    print(f"Changed dimensions: {', '.join(changed) or 'none'}")
+
+    base = os.path.splitext(output_file)[0]
+    added_file = f"{base}.added.txt"
+    removed_file = f"{base}.removed.txt"
+
+    added = external_sort_unique(_delta_candidates(TEMPLATES, old_templates), memory_budget, tmp_dir, render=None)
+    added_count = write_keywords(
+        (k for k in added if not any(t.contains(k) for t in old_templates)), added_file)[0]
+    removed = external_sort_unique(_delta_candidates(old_templates, TEMPLATES), memory_budget, tmp_dir, render=None)
+    removed_count = write_keywords(
+        (k for k in removed if not any(t.contains(k) for t in TEMPLATES)), removed_file)[0]
+
+    print(f"  Added: {added_count} keywords -> {added_file}")
+    print(f"  Removed: {removed_count} keywords -> {removed_file}")
+    if export:
+        for _ in _export_rows(map(describe_keyword, read_lines(added_file)), *export):
+            pass
+        print(f"  Exported rows for added keywords -> {export[0]}")
+    yield from _apply_delta(read_lines(output_file), read_lines(added_file), read_lines(removed_file))
+
+
+# --- Instrumentation ---
+# Every run writes <output>.metrics.json with wall and CPU time per phase,
+# keywords emitted and kept per Type, and write throughput, so CI can chart
+# generation cost over time. The pipeline streams, so phases are split where
+# the first sorted keyword comes out: "generate" covers enumerating,
+# rendering, sorting and spilling runs, "merge_write" merging the runs and
+# writing the output.
+METRICS_VERSION = 1
+PROFILE_TOP = 40
+
+
+def _cpu_seconds():
+    """CPU time of this process plus its finished worker processes."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class Profiler:
+    """
+    Opt-in cProfile and tracemalloc hook (--profile DIR).
+
+    Writes the raw cProfile stats, the hottest functions by cumulative time
+    and, for each phase, the lines holding the most traced memory when it
+    ended. Only the main process is profiled; with --jobs the workers are not.
+    """
+
+    def __init__(self, profile_dir):
+        self.profile_dir = profile_dir
+        self.profile = cProfile.Profile()
+        self.snapshots = []
+
+    def start(self):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        tracemalloc.start()
+        self.profile.enable()
+
+    def snapshot(self, phase):
+        if tracemalloc.is_tracing():
+            self.snapshots.append((phase, tracemalloc.take_snapshot()))
+
+    def stop(self):
+        self.profile.disable()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.profile.dump_stats(os.path.join(self.profile_dir, "generate_keywords.prof"))
+        with open(os.path.join(self.profile_dir, "cpu.txt"), "w", encoding="utf-8") as f:
+            pstats.Stats(self.profile, stream=f).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        with open(os.path.join(self.profile_dir, "memory.txt"), "w", encoding="utf-8") as f:
+            f.write(f"Peak traced memory: {peak / 2**20:.1f} MB\n")
+            for phase, snapshot in self.snapshots:
+                f.write(f"\nLargest allocations at the end of {phase}:\n")
+                for stat in snapshot.statistics("lineno")[:PROFILE_TOP]:
+                    f.write(f"  {stat}\n")
+
+
+class Metrics:
+    """Phase timings and per-Type counts for one run."""
+
+    def __init__(self, settings, profiler=None):
+        self.mode = None
+        self.settings = settings
+        self.profiler = profiler
+        self.phases = {}
+        self.emitted = dict.fromkeys(range(1, len(KEYWORD_TYPES) + 1), 0)
+        self.unique = dict.fromkeys(range(1, len(KEYWORD_TYPES) + 1), 0)
+        self.output = None
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        started = time.perf_counter(), _cpu_seconds()
+        try:
+            yield
+        finally:
+            self.phases[name] = {
+                "wall_seconds": round(time.perf_counter() - started[0], 4),
+                "cpu_seconds": round(_cpu_seconds() - started[1], 4),
+            }
+            if self.profiler:
+                self.profiler.snapshot(name)
+
+    def split_phases(self, items, first, second):
+        """Charge the time until items yields its first value to phase `first`, the rest to `second`."""
+        with self.phase(first):
+            iterator = iter(items)
+            head = list(itertools.islice(iterator, 1))
+        with self.phase(second):
+            yield from head
+            yield from iterator
+
+    def record_output(self, output_file, keywords, phase):
+        size = os.path.getsize(output_file)
+        seconds = self.phases[phase]["wall_seconds"]
+        self.output = {
+            "path": output_file,
+            "keywords": keywords,
+            "bytes": size,
+            "keywords_per_second": round(keywords / seconds, 1) if seconds else None,
+            "bytes_per_second": round(size / seconds, 1) if seconds else None,
+        }
+
+    def types(self):
+        """Per-Type counts; a keyword several Types produce is kept once and credited to the first in sort order."""
+        if self.mode == "incremental":
+            return {}
+        report = {}
+        for type_number, label in enumerate(KEYWORD_TYPES, start=1):
+            emitted, unique = self.emitted[type_number], self.unique[type_number]
+            report[str(type_number)] = {
+                "label": label,
+                "emitted": emitted,
+                "unique": unique,
+                "duplicates": emitted - unique,
+                "dedup_hit_rate": round((emitted - unique) / emitted, 6) if emitted else 0.0,
+            }
+        return report
+
+    def as_dict(self):
+        types = self.types()
+        emitted = sum(t["emitted"] for t in types.values())
+        unique = sum(t["unique"] for t in types.values())
+        return {
+            "version": METRICS_VERSION,
+            "mode": self.mode,
+            "settings": self.settings,
+            "phases": self.phases,
+            "types": types,
+            "totals": {"emitted": emitted, "unique": unique, "duplicates": emitted - unique} if types else {},
+            "output": self.output,
+        }
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+
+def _count_types(sorted_lines, unique, strip=False):
+    """
+    Keep one line per keyword, from its lowest keyword Type, counting kept
+    keywords per Type into `unique`. Lines are a keyword, a tab, optionally
+    more fields, and the keyword Type last; with strip=True they are just
+    keyword and Type, and only the keyword is yielded. Lines of one keyword
+    are adjacent, but sort by their Type as text ("10" before "2"), so the
+    Types are compared as numbers.
+    """
+    counts = dict.fromkeys(unique, 0)
+    previous = best = None
+    best_type = 0
+    for line in sorted_lines:
+        keyword, _, rest = line.partition("\t")
+        type_number = int(rest if strip else rest[rest.rindex("\t") + 1:])
+        if keyword == previous:
+            if type_number < best_type:
+                best, best_type = line, type_number
+            continue
+        if previous is not None:
+            counts[best_type] += 1
+            yield previous if strip else best
+        previous, best, best_type = keyword, line, type_number
+    if previous is not None:
+        counts[best_type] += 1
+        yield previous if strip else best
+    for type_number in unique:
+        unique[type_number] += counts[type_number]
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode="w", newline=None):
+    """
+    Open <path>.partial for writing and move it over path when the block
+    finishes, so readers see the old file or the complete new one, never a
+    partial write. Text modes use UTF-8.
+    """
+    partial = f"{path}.partial"
+    with open(partial, mode, encoding=None if "b" in mode else "utf-8", newline=newline) as f:
+        yield f
+    os.replace(partial, path)
+
+
+def write_keywords(sorted_keywords, output_file):
+    """Write keywords one per line; returns (count, total length)."""
+    total = 0
+    total_length = 0
+    with atomic_write(output_file) as f:
+        for keyword in sorted_keywords:
+            f.write(f"{keyword}\n")
+            total += 1
+            total_length += len(keyword)
+    return total, total_length
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate SEO keywords for Stylr SA")
+    parser.add_argument("--output", default="keyword_list.txt",
+                        help="Where to write the sorted keyword list (default: keyword_list.txt)")
+    parser.add_argument("--memory-budget", type=float, default=64, metavar="MB",
+                        help="Approximate memory for the sort buffer before spilling runs to disk (default: 64)")
+    parser.add_argument("--tmp-dir", default=None,
+                        help="Directory for spilled sort runs (default: system temp dir)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Worker processes for full builds; 0 uses every CPU (default: 1, serial). "
+                             "An --incremental patch always runs serially")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Patch the previous output using its manifest and write .added/.removed delta files")
+    parser.add_argument("--manifest", default=None,
+                        help="Manifest path (default: <output>.manifest.json)")
+    parser.add_argument("--copy-output", default=None, metavar="PATH",
+                        help="Also export seo_keywords rows ready for COPY / load_seo_keywords.py "
+                             "(only the added keywords in --incremental mode)")
+    parser.add_argument("--copy-format", choices=["tsv", "csv"], default="tsv",
+                        help="tsv is COPY text format, csv has a header row (default: tsv)")
+    parser.add_argument("--spec", default=None, metavar="PATH",
+                        help="JSON keyword spec merged over the built-in one (see KEYWORD_SPEC)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Print exact generated and unique counts per template without generating keywords")
+    parser.add_argument("--catalog", action="store_true",
+                        help="Take locations from the backend/frontend TypeScript data (location_catalog.py) "
+                             "instead of the list in this file")
+    parser.add_argument("--weights", default=None, metavar="PATH",
+                        help="JSON or CSV of per-location/per-service weights (e.g. population, salon count); "
+                             "Types 5-7 keep their best-scoring keywords over every location instead of "
+                             "the first 30-50")
+    parser.add_argument("--max-keywords", type=int, default=None, metavar="N",
+                        help="With --weights, keep only the N best-scoring keywords overall (page budget)")
+    parser.add_argument("--salons", default=None, metavar="PATH",
+                        help="JSON or CSV export of salon latitude/longitude; skip service/location pages "
+                             "without a salon within --radius (see salon_supply.py)")
+    parser.add_argument("--centroids", default=None, metavar="PATH",
+                        help="JSON or CSV of location name, latitude and longitude, for --salons")
+    parser.add_argument("--radius", type=float, default=50, metavar="KM",
+                        help="Distance from a location's centroid that counts as supply (default: 50)")
+    parser.add_argument("--index", default=None, metavar="PATH",
+                        help="Also build a memory-mapped slug -> keyword index (see keyword_index.py)")
+    parser.add_argument("--sitemap-dir", default=None, metavar="DIR",
+                        help="Also write gzipped sitemaps of the keyword pages and their index to DIR "
+                             "(see keyword_sitemap.py)")
+    parser.add_argument("--sitemap-base-url", default=None, metavar="URL",
+                        help="Site URL for sitemap links (default: $FRONTEND_URL or https://www.stylrsa.co.za)")
+    parser.add_argument("--shards", type=int, default=None, metavar="N",
+                        help="Also split the keywords into N stable hash shards with a manifest "
+                             "(see keyword_shards.py)")
+    parser.add_argument("--shard-dir", default=None, metavar="DIR",
+                        help="Directory for --shards (default: <output without .txt>.shards)")
+    parser.add_argument("--metrics", default=None, metavar="PATH",
+                        help="Where to write phase timings and per-Type counts as JSON "
+                             "(default: <output>.metrics.json)")
+    parser.add_argument("--profile", default=None, metavar="DIR",
+                        help="Run under cProfile and tracemalloc and write hot-path reports to DIR "
+                             "(main process only; slows generation down)")
+    args = parser.parse_args(argv)
+    if args.max_keywords is not None and not args.weights:
+        parser.error("--max-keywords needs --weights to rank keywords by")
+    if args.max_keywords is not None and args.max_keywords < 1:
+        parser.error("--max-keywords must be at least 1")
+    if args.weights and args.incremental:
+        parser.error("--weights cannot be combined with --incremental; weighted output is always built in full")
+    if bool(args.salons) != bool(args.centroids):
+        parser.error("--salons and --centroids go together")
+    if args.salons and args.incremental:
+        parser.error("--salons cannot be combined with --incremental; pruned output is always built in full")
+    if args.radius <= 0:
+        parser.error("--radius must be positive")
+    if args.shard_dir and args.shards is None:
+        parser.error("--shard-dir needs --shards")
+    if args.dry_run and (args.weights or args.salons or args.incremental):
+        parser.error("--dry-run counts the spec; it cannot be combined with --weights, --salons or --incremental")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.spec:
+        try:
+            set_spec(load_spec(args.spec))
+        except (OSError, ValueError) as error:
+            raise SystemExit(f"Could not load spec from {args.spec}: {error}")
+    jobs = args.jobs or os.cpu_count() or 1
+    profiler = Profiler(args.profile) if args.profile else None
+    metrics = Metrics({"jobs": jobs, "memory_budget_mb": args.memory_budget, "catalog": args.catalog,
+                       "copy_output": bool(args.copy_output), "weights": args.weights,
+                       "max_keywords": args.max_keywords, "salons": args.salons,
+                       "radius_km": args.radius if args.salons else None, "shards": args.shards}, profiler)
+    if profiler:
+        profiler.start()
+
+    location_source = KEYWORD_SPEC["dimensions"]["location"].get("values", locations)
+    if args.catalog:
+        from location_catalog import load_catalog
+        with metrics.phase("load_catalog"):
+            location_source = load_catalog().names()
+            set_locations(location_source)
+        print("Locations loaded from the location catalog")
+
+    print("Generating keywords...")
+    for label, name in [("Services", "service"), ("Locations", "location"),
+                        ("Prefix modifiers", "prefix"), ("Suffix modifiers", "suffix")]:
+        values = location_source if name == "location" else KEYWORD_SPEC["dimensions"].get(name, {}).get("values")
+        if values is None or name not in DIMENSIONS:
+            continue
+        duplicates = len(values) - len(canonical(values))
+        note = f" ({duplicates} duplicates dropped)" if duplicates else ""
+        print(f"{label}: {len(DIMENSIONS[name])}{note}")
+    print()
+
+    if args.dry_run:
+        from keyword_cardinality import dedup_counts, print_counts
+        started = time.perf_counter()
+        results = dedup_counts(TEMPLATES)
+        print_counts(results, KEYWORD_TYPES, time.perf_counter() - started)
+        return
+
+    if args.salons:
+        from salon_supply import load_supply
+        try:
+            with metrics.phase("geo_index"):
+                supply, report = load_supply(args.salons, args.centroids, args.radius,
+                                             DIMENSIONS["service"], DIMENSIONS["location"])
+        except (OSError, ValueError) as error:
+            raise SystemExit(f"Could not load salon supply: {error}")
+        SUPPLY.update(supply)
+        print(f"Geo pruning: {report['salons']:,} salons, {args.radius:g} km radius")
+        print(f"  {report['with_supply']:,} of {report['with_centroid']:,} located places have supply; "
+              f"{report['locations'] - report['with_centroid']:,} locations without a centroid are kept")
+        if report["unmatched_centroids"]:
+            print(f"⚠️  {len(report['unmatched_centroids'])} centroid(s) match no location")
+        if report["unknown_services"]:
+            print(f"⚠️  Unknown salon service names ignored: {', '.join(report['unknown_services'][:5])}")
+        print()
+
+    if args.weights:
+        try:
+            scorer = Scorer(load_weights(args.weights))
+        except (OSError, ValueError) as error:
+            raise SystemExit(f"Could not load weights from {args.weights}: {error}")
+        for name, values in scorer.unmatched().items():
+            print(f"⚠️  {len(values)} {name} weight(s) match no {name}: {', '.join(values[:5])}"
+                  f"{', ...' if len(values) > 5 else ''}")
+        budgets = selective_budgets()
+        set_locations(DIMENSIONS["location"], sliced=False)
+        with metrics.phase("select"):
+            SELECTED.update(select_codes(scorer, budgets, args.max_keywords))
+        print(f"Weighted selection from {args.weights}:")
+        for type_number, codes in SELECTED.items():
+            candidates = sum(t.size for t in TEMPLATES if t.type_number == type_number)
+            print(f"  Type {type_number}: {len(codes):,} of {candidates:,} candidates")
+        print()
+
+    output_file = args.output
+    manifest_file = args.manifest or f"{os.path.splitext(output_file)[0]}.manifest.json"
+    metrics_file = args.metrics or f"{os.path.splitext(output_file)[0]}.metrics.json"
+    memory_budget = int(args.memory_budget * 1024 * 1024)
+
+    pruning = pruning_inputs(args.weights, args.max_keywords)
+    manifest = None
+    if args.incremental:
+        manifest, reason = load_manifest(manifest_file, output_file, pruning)
+        if manifest is None:
+            print(f"Full rebuild: {reason}")
+
+    export = (args.copy_output, args.copy_format) if args.copy_output else None
+    # Rows and tagged keywords both end in the keyword Type, for _count_types
+    render = render_row if export else render_tagged
+    if manifest is not None:
+        metrics.mode = "incremental"
+        print(f"Incremental update of {output_file}...")
+        if jobs > 1:
+            print(f"⚠️  --jobs {args.jobs} is ignored: the incremental patch runs serially "
+                  "(--jobs applies when --incremental falls back to a full rebuild)")
+        sorted_keywords = incremental_sort_unique(manifest, output_file, memory_budget, args.tmp_dir, export)
+    else:
+        if jobs > 1:
+            metrics.mode = "parallel"
+            print(f"Generating in parallel with {jobs} workers...")
+            sorted_lines = parallel_sort_unique(jobs, memory_budget, metrics.emitted, args.tmp_dir, render)
+        else:
+            metrics.mode = "serial"
+            sorted_lines = external_sort_unique(generate_codes(metrics.emitted), memory_budget, args.tmp_dir, render)
+        if export:
+            sorted_keywords = _export_rows(_count_types(sorted_lines, metrics.unique), *export)
+        else:
+            sorted_keywords = _count_types(sorted_lines, metrics.unique, strip=True)
+
+    sitemaps = None
+    if args.sitemap_dir:
+        from keyword_sitemap import DEFAULT_BASE_URL, SitemapWriter
+        sitemaps = SitemapWriter(args.sitemap_dir, args.sitemap_base_url or DEFAULT_BASE_URL)
+        sorted_keywords = sitemaps.tap(sorted_keywords)
+    shards = None
+    if args.shards is not None:
+        from keyword_shards import ShardError, ShardWriter
+        shard_dir = args.shard_dir or f"{os.path.splitext(output_file)[0]}.shards"
+        try:
+            shards = ShardWriter(shard_dir, args.shards)
+        except ShardError as error:
+            raise SystemExit(f"--shards: {error}")
+        sorted_keywords = shards.tap(sorted_keywords)
+
+    # --- Save to file ---
+    total, total_length = write_keywords(metrics.split_phases(sorted_keywords, "generate", "merge_write"),
+                                          output_file)
+    metrics.record_output(output_file, total, "merge_write")
+    if sitemaps:
+        sitemap_index = sitemaps.close()
+    if shards:
+        shard_manifest = shards.close()
+    with metrics.phase("manifest"):
+        with atomic_write(manifest_file) as f:
+            json.dump(build_manifest(output_file, total, pruning), f, ensure_ascii=False)
+    if args.index:
+        from keyword_index import build_index
+        with metrics.phase("index"):
+            build_index(read_lines(output_file), args.index, memory_budget, args.tmp_dir)
+
+    # --- Print Results ---
+    print()
+    print("=" * 60)
+    print(f"Total Unique Keywords Generated: {total}")
+    print("=" * 60)
+    print()
+    print(f"✅ Keyword list saved to {output_file}")
+    if export:
+        print(f"✅ Database rows saved to {args.copy_output}")
+    if args.index:
+        print(f"✅ Slug index saved to {args.index}")
+    if sitemaps:
+        print(f"✅ {sitemaps.urls:,} URLs in {len(sitemaps.files)} sitemaps, index at {sitemap_index}")
+    if shards:
+        print(f"✅ {sum(shards.counts):,} keywords in {shards.shards} shards, manifest at {shard_manifest}")
+    print()
+
+    # --- Keyword analysis ---
+    print("Keyword Analysis:")
+    print(f"  - Total keywords: {total:,}")
+    if total:
+        print(f"  - Average length: {total_length / total:.1f} characters")
+    print()
+
+    print("Keyword Distribution:")
+    with metrics.phase("analysis"):
+        distribution = keyword_distribution()
+    for label, count in distribution.items():
+        print(f"  - {label}: {count:,}")
+    print()
+
+    types = metrics.types()
+    if types:
+        print("Keyword Types:")
+        for counts in types.values():
+            print(f"  {counts['label']}")
+            print(f"    Generated: {counts['emitted']:,} | Unique: {counts['unique']:,} "
+                  f"| Duplicates: {counts['duplicates']:,} ({counts['dedup_hit_rate']:.2%})")
+        print()
+
+    if profiler:
+        profiler.stop()
+        print(f"✅ Profile reports saved to {args.profile}")
+    print("Timings:")
+    for name, phase in metrics.phases.items():
+        print(f"  - {name}: {phase['wall_seconds']:.2f}s wall, {phase['cpu_seconds']:.2f}s CPU")
+    written = metrics.output
+    if written["keywords_per_second"]:
+        print(f"  - Write throughput: {written['keywords_per_second']:,.0f} keywords/s "
+              f"({written['bytes_per_second'] / 2**20:.1f} MB/s)")
+    metrics.write(metrics_file)
+    print(f"✅ Metrics saved to {metrics_file}")
+    print()
+
+    print("✅ Keyword generation complete!")
+    print()
+    print("Next steps:")
+    print(f"1. Review {output_file}")
+    print("2. Use these keywords to create content pages")
+    print("3. Update your site's metadata with relevant keywords")
+    print("4. Submit sitemap to Google Search Console")
+
 
+if __name__ == "__main__":
+    main()
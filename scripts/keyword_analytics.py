@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Keyword analytics for an existing keyword_list.txt
+
+Counts how often each location, service and modifier from generate_keywords.py
+appears in a keyword file, in a single scan. All patterns are compiled into
+one Aho-Corasick automaton over whitespace-separated words, so each keyword
+costs a handful of dictionary lookups no matter how many patterns there are.
+
+Usage: python scripts/keyword_analytics.py [keyword_list.txt] [--top 10] [--json report.json]
+"""
+
+import argparse
+import json
+from collections import Counter, deque
+
+from generate_keywords import DIMENSIONS
+
+# Pattern categories and the generator dimensions they are built from
+CATEGORIES = {
+    "location": ["location"],
+    "service": ["service", "variation"],
+    "modifier": ["prefix", "suffix", "high_value_prefix", "high_value_suffix"],
+    "competitor": ["competitor"],
+}
+
+
+class MultiPatternMatcher:
+    """
+    Aho-Corasick automaton whose alphabet is words rather than characters.
+
+    Patterns only match on word boundaries, which is what we want for
+    locations and services ("spa" should not match inside "Spanish").
+    """
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+
+    def add(self, pattern, value):
+        state = 0
+        for word in pattern.lower().split():
+            next_state = self.goto[state].get(word)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][word] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            state = next_state
+        self.outputs[state].append((len(pattern.split()), value))
+
+    def build(self):
+        """Compute failure links breadth-first and merge inherited outputs."""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and word not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(word, 0)
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+        return self
+
+    def find(self, words):
+        """Yield (start word, end word, value) for every pattern occurrence."""
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        state = 0
+        for end, word in enumerate(words, start=1):
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            for length, value in outputs[state]:
+                yield end - length, end, value
+
+
+def build_matcher(categories=CATEGORIES):
+    matcher = MultiPatternMatcher()
+    for category, dimensions in categories.items():
+        for dimension in dimensions:
+            for pattern in DIMENSIONS[dimension]:
+                matcher.add(pattern, (category, pattern))
+    return matcher.build()
+
+
+def _longest_per_category(matches):
+    """Drop matches nested inside a longer match of the same category ("Durban" inside "Durban North")."""
+    kept = []
+    for start, end, (category, pattern) in matches:
+        if any(c == category and s <= start and end <= e and (s, e) != (start, end)
+               for s, e, (c, _) in matches):
+            continue
+        kept.append((category, pattern))
+    return set(kept)
+
+
+def analyse(lines, matcher):
+    """Scan keywords once and count matches per category and per pattern."""
+    total = 0
+    total_length = 0
+    keywords_per_category = Counter()
+    patterns = {category: Counter() for category in CATEGORIES}
+    for line in lines:
+        keyword = line.rstrip("\n")
+        if not keyword:
+            continue
+        total += 1
+        total_length += len(keyword)
+        matches = list(matcher.find(keyword.lower().split()))
+        found = _longest_per_category(matches) if len(matches) > 1 else {value for _, _, value in matches}
+        for category in {category for category, _ in found}:
+            keywords_per_category[category] += 1
+        for category, pattern in found:
+            patterns[category][pattern] += 1
+    return {
+        "total": total,
+        "average_length": total_length / total if total else 0,
+        "keywords_per_category": dict(keywords_per_category),
+        "patterns": {category: dict(counts) for category, counts in patterns.items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count locations, services and modifiers in a keyword file")
+    parser.add_argument("keyword_file", nargs="?", default="keyword_list.txt")
+    parser.add_argument("--top", type=int, default=10, help="How many of each category to list (default: 10)")
+    parser.add_argument("--json", dest="json_path", help="Also write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    with open(args.keyword_file, encoding="utf-8") as f:
+        report = analyse(f, build_matcher())
+
+    print(f"Keyword Analysis: {args.keyword_file}")
+    print(f"  - Total keywords: {report['total']:,}")
+    print(f"  - Average length: {report['average_length']:.1f} characters")
+    print()
+    for category, counts in report["patterns"].items():
+        print(f"{category.title()} keywords: {report['keywords_per_category'].get(category, 0):,}")
+        for pattern, count in Counter(counts).most_common(args.top):
+            print(f"  - {pattern}: {count:,}")
+        print()
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"✅ Report saved to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Exact keyword counts for the keyword spec, without generating keywords
+
+A template's keywords are the cross product of its dimensions, so its size
+is a product. Keywords two templates share are counted as well: each
+template is read as a chain of literal text and dimension values, and a
+dynamic program walks the templates side by side, one piece at a time,
+remembering only the text one side has produced beyond the other. Each way
+of finishing all sides together is one shared keyword. Memoising on
+(positions, offsets, pending text) keeps this to a few thousand steps
+instead of millions of strings.
+
+Each template's unique count is its size minus the keywords an earlier
+template already produced, by inclusion-exclusion over the earlier
+templates it overlaps. This is the same crediting generate_keywords.py's
+metrics use (a shared keyword counts for the lowest Type), so the totals
+match a real run exactly. The dynamic program counts ways of forming a
+keyword, not keywords, so a template whose dimensions can form the same
+keyword in two ways is flagged as ambiguous. Such a template, and any
+template overlapping one, is counted by rendering its keywords and testing
+each against the earlier templates instead; that is exact, and cheap for
+the small templates where ambiguity turns up.
+
+generate_keywords.py --dry-run prints these counts; --spec sizes a change
+before running the build.
+
+Usage: python scripts/keyword_cardinality.py [--spec spec.json] [--catalog] [--json counts.json]
+"""
+
+import argparse
+import bisect
+import functools
+import json
+import sys
+import time
+
+import generate_keywords as gk
+
+
+def template_pieces(template):
+    """The template as a tuple of pieces: literal strings and (sorted values, value set) pairs."""
+    pieces = []
+    for literal, dim in zip(template.parts, template.dims + [None]):
+        if literal:
+            pieces.append(literal)
+        if dim is not None:
+            values = sorted(dim)
+            pieces.append((tuple(values), frozenset(values)))
+    return tuple(pieces)
+
+
+def _candidates(piece, pending):
+    """The texts `piece` can contribute that agree with `pending`, the text already fixed ahead."""
+    if isinstance(piece, str):
+        return [piece] if piece.startswith(pending) or pending.startswith(piece) else []
+    values, value_set = piece
+    if not pending:
+        return values
+    # Values that start with the pending text, then values the pending text starts with
+    start = bisect.bisect_left(values, pending)
+    matches = []
+    for value in values[start:]:
+        if not value.startswith(pending):
+            break
+        matches.append(value)
+    matches.extend(pending[:length] for length in range(1, len(pending)) if pending[:length] in value_set)
+    return matches
+
+
+def shared_count(*pieces):
+    """
+    Number of ways every template (given as template_pieces) can produce
+    the same string at once; for unambiguous templates, the number of
+    keywords they all share.
+    """
+    sides = len(pieces)
+
+    @functools.lru_cache(maxsize=None)
+    def count(positions, offsets, pending):
+        # Advance the first unfinished side that is furthest behind (offset 0)
+        behind = [side for side in range(sides) if offsets[side] == 0]
+        moving = next((side for side in behind if positions[side] < len(pieces[side])), None)
+        if moving is None:
+            return 1 if not pending and all(p == len(pc) for p, pc in zip(positions, pieces)) else 0
+        if pending and any(positions[side] == len(pieces[side]) for side in behind):
+            return 0  # A finished side's string ends before another side's does
+        total = 0
+        for text in _candidates(pieces[moving][positions[moving]], pending):
+            new_pending = text if len(text) > len(pending) else pending
+            new_offsets = list(offsets)
+            new_offsets[moving] = len(text)
+            shift = min(new_offsets)
+            new_positions = list(positions)
+            new_positions[moving] += 1
+            total += count(tuple(new_positions), tuple(offset - shift for offset in new_offsets),
+                           new_pending[shift:])
+        return total
+
+    return count((0,) * sides, (0,) * sides, "")
+
+
+def enumerated_unique(template, earlier):
+    """Distinct keywords of template that none of the earlier templates produces, by rendering each one."""
+    keywords = {template.render(index) for index in range(template.size)}
+    return sum(1 for keyword in keywords if not any(other.contains(keyword) for other in earlier))
+
+
+def covered_count(shared, overlaps, i):
+    """
+    Keywords of template i that the overlapping earlier templates produce,
+    by inclusion-exclusion over them; a group sharing nothing is not extended.
+    """
+    covered = 0
+
+    def visit(chosen, start, sign):
+        nonlocal covered
+        for k in range(start, len(overlaps)):
+            group = chosen + (overlaps[k],)
+            size = shared(group + (i,))
+            if size:
+                covered += sign * size
+                visit(group, k + 1, -sign)
+
+    visit((), 0, 1)
+    return covered
+
+
+def dedup_counts(templates):
+    """
+    Per-template counts, in spec order: a dict with type, format, size,
+    unique (keywords no earlier template produces), overlaps (earlier
+    template formats sharing keywords) and ambiguous.
+    """
+    pieces = [template_pieces(t) for t in templates]
+
+    @functools.lru_cache(maxsize=None)
+    def shared(group):
+        return shared_count(*(pieces[i] for i in group))
+
+    ambiguous = [shared((i, i)) != template.size for i, template in enumerate(templates)]
+    results = []
+    for i, template in enumerate(templates):
+        overlaps = [j for j in range(i) if shared((j, i))]
+        if ambiguous[i] or any(ambiguous[j] for j in overlaps):
+            # Shared counts would count some keywords more than once
+            unique = enumerated_unique(template, [templates[j] for j in overlaps])
+        else:
+            unique = template.size - covered_count(shared, overlaps, i)
+        results.append({
+            "type": template.type_number,
+            "format": template.fmt,
+            "size": template.size,
+            "unique": unique,
+            "overlaps": [templates[j].fmt for j in overlaps],
+            "ambiguous": ambiguous[i],
+        })
+    return results
+
+
+def type_counts(results, type_count):
+    """{Type: (generated, unique)} from dedup_counts results."""
+    totals = {type_number: [0, 0] for type_number in range(1, type_count + 1)}
+    for result in results:
+        totals[result["type"]][0] += result["size"]
+        totals[result["type"]][1] += result["unique"]
+    return {type_number: tuple(counts) for type_number, counts in totals.items()}
+
+
+def print_counts(results, labels, elapsed):
+    """Print dedup_counts results grouped under the Type labels."""
+    print("Dry run: keyword counts from the spec, nothing generated")
+    per_type = type_counts(results, len(labels))
+    for type_number, label in enumerate(labels, start=1):
+        generated, unique = per_type[type_number]
+        print(f"  {label}")
+        print(f"    Generated: {generated:,} | Unique: {unique:,} | Duplicates: {generated - unique:,}")
+        for result in results:
+            if result["type"] != type_number:
+                continue
+            notes = []
+            if result["overlaps"]:
+                notes.append("overlaps " + ", ".join(result["overlaps"]))
+            if result["ambiguous"]:
+                notes.append("ambiguous, counted by enumeration")
+            note = f" ({'; '.join(notes)})" if notes else ""
+            print(f"      {result['format']}: {result['size']:,} -> {result['unique']:,}{note}")
+    generated = sum(result["size"] for result in results)
+    unique = sum(result["unique"] for result in results)
+    print(f"Total: {generated:,} generated, {unique:,} unique ({generated - unique:,} duplicates)")
+    print(f"Counted in {elapsed * 1000:.0f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count the keywords the spec produces without generating them")
+    parser.add_argument("--spec", default=None, metavar="PATH", help="JSON spec merged over the built-in one")
+    parser.add_argument("--catalog", action="store_true", help="Take locations from the location catalog")
+    parser.add_argument("--json", dest="json_path", help="Also write the per-template counts as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.spec:
+            gk.set_spec(gk.load_spec(args.spec))
+    except (OSError, ValueError) as error:
+        sys.exit(f"Could not load spec from {args.spec}: {error}")
+    if args.catalog:
+        from location_catalog import load_catalog
+        gk.set_locations(load_catalog().names())
+
+    started = time.perf_counter()
+    results = dedup_counts(gk.TEMPLATES)
+    print_counts(results, gk.KEYWORD_TYPES, time.perf_counter() - started)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Counts saved to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate clustering for a generated keyword list
+
+Many keywords compete for the same search: "hair color" and "hair colour",
+"Nelspruit" and "Mbombela", or "braids Durban near me" (Type 4) and
+"braids near me Durban" (Type 7). This stage groups them, keeps one
+canonical keyword per group and writes an alias map, so only canonical pages
+are generated and warmed and the others can redirect.
+
+Keywords are first rewritten with the alias tables below, lowercased and
+reduced to their set of words. By default keywords with the same word set
+form a cluster (Jaccard similarity 1.0). With --threshold below 1, MinHash
+signatures over the word sets are bucketed LSH-style and candidates whose
+exact Jaccard similarity reaches the threshold are merged too. Signatures
+are computed with NumPy when it is installed (pip install numpy); the
+pure-Python fallback gives the same clusters, only slower. Review the alias
+map before using low thresholds: at 0.8 "<service> <location> near me"
+already merges into "<service> near me".
+
+Buckets are grouped with the generator's external sort and clusters are
+kept as two integer arrays, so memory stays near --memory-budget plus 16
+bytes per keyword.
+
+The canonical keyword of a cluster is the one that already uses canonical
+names, then the shortest, then the first alphabetically.
+
+Outputs, next to --output-base (default: the keyword file without .txt):
+  <base>.canonical.txt  sorted keywords to keep
+  <base>.aliases.tsv    alias keyword, canonical keyword, alias slug, canonical slug
+
+Usage: python scripts/keyword_clusters.py [keyword_list.txt] [--threshold 1.0] [--output-base keyword_list]
+"""
+
+import argparse
+import itertools
+import os
+import random
+import re
+import time
+import zlib
+from array import array
+
+from generate_keywords import external_sort_unique, read_lines, slugify
+
+# Alias -> canonical name. Locations use the current official names, which
+# the frontend location pages already use.
+LOCATION_ALIASES = {
+    "Nelspruit": "Mbombela",
+    "Port Elizabeth": "Gqeberha",
+    "Pietersburg": "Polokwane",
+    "Witbank": "Emalahleni",
+}
+SERVICE_ALIASES = {
+    "hair color": "hair colour",
+    "makeup artist near me": "makeup artist",
+    "hair salon near me": "hair salon",
+    "barber shop": "barbershop",
+}
+
+# MinHash settings; the permutations are seeded so every run (and both
+# signature implementations) agree
+NUM_PERM = 32
+MINHASH_SEED = 1
+MERSENNE_PRIME = (1 << 31) - 1
+BAND_MULTIPLIER = 0x100000001B3
+MASK64 = (1 << 64) - 1
+# Candidates in one LSH bucket are checked against at most this many anchors
+MAX_ANCHORS = 8
+BUCKET_CHUNK = 10000
+
+
+# --- Normalisation ---
+def alias_pattern(aliases):
+    phrases = sorted(aliases, key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(map(re.escape, phrases)) + r")\b", re.IGNORECASE)
+
+
+ALIASES = {alias.lower(): canonical for alias, canonical in {**LOCATION_ALIASES, **SERVICE_ALIASES}.items()}
+ALIAS_PATTERN = alias_pattern(ALIASES)
+
+
+def apply_aliases(keyword):
+    return ALIAS_PATTERN.sub(lambda match: ALIASES[match.group().lower()], keyword)
+
+
+def word_set(keyword):
+    """The lowercased words of the keyword after alias rewriting."""
+    return frozenset(apply_aliases(keyword).lower().split())
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+# --- MinHash ---
+def lsh_bands(threshold, num_perm=NUM_PERM):
+    """(bands, rows) whose LSH threshold (1/bands) ** (1/rows) is closest to threshold."""
+    options = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    return min(options, key=lambda option: abs((1 / option[0]) ** (1 / option[1]) - threshold))
+
+
+def _permutations(num_perm=NUM_PERM):
+    rng = random.Random(MINHASH_SEED)
+    return ([rng.randrange(1, MERSENNE_PRIME) for _ in range(num_perm)],
+            [rng.randrange(0, MERSENNE_PRIME) for _ in range(num_perm)])
+
+
+def _word_hashes(words):
+    return [zlib.crc32(word.encode("utf-8")) % MERSENNE_PRIME for word in sorted(words)] or [0]
+
+
+def _band_keys(signature, bands, rows):
+    keys = []
+    for band in range(bands):
+        key = 0
+        for value in signature[band * rows:(band + 1) * rows]:
+            key = (key * BAND_MULTIPLIER + value) & MASK64
+        keys.append(key)
+    return keys
+
+
+def band_keys_python(word_sets, bands, rows):
+    """LSH band keys for each word set, one list of `bands` ints per set."""
+    a, b = _permutations(bands * rows)
+    coefficients = list(zip(a, b))
+    result = []
+    for words in word_sets:
+        hashes = _word_hashes(words)
+        signature = [min((ai * x + bi) % MERSENNE_PRIME for x in hashes) for ai, bi in coefficients]
+        result.append(_band_keys(signature, bands, rows))
+    return result
+
+
+def band_keys_numpy(word_sets, bands, rows):
+    """Same band keys as band_keys_python, with the signatures computed as one array operation per batch."""
+    import numpy as np
+
+    a, b = (np.array(values, dtype=np.uint64) for values in _permutations(bands * rows))
+    hashes = [_word_hashes(words) for words in word_sets]
+    width = max(map(len, hashes))
+    # Pad with each set's first hash; repeating a value does not change a minimum
+    matrix = np.array([h + [h[0]] * (width - len(h)) for h in hashes], dtype=np.uint64)
+    signatures = ((matrix[:, :, None] * a + b) % np.uint64(MERSENNE_PRIME)).min(axis=1)
+    keys = np.zeros((len(hashes), bands), dtype=np.uint64)
+    for row in range(rows):
+        # uint64 arithmetic wraps, matching the & MASK64 in _band_keys
+        keys = keys * np.uint64(BAND_MULTIPLIER) + signatures[:, row::rows][:, :bands]
+    return keys.tolist()
+
+
+def signature_backend():
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return band_keys_python
+    return band_keys_numpy
+
+
+# --- Clustering ---
+class Clusters:
+    """Union-find over keyword ids, in two flat arrays."""
+
+    def __init__(self, count):
+        self.parent = array("q", range(count))
+        self.size = array("q", [1]) * count
+
+    def find(self, i):
+        parent = self.parent
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    def union(self, i, j):
+        i, j = self.find(i), self.find(j)
+        if i == j:
+            return False
+        if self.size[i] < self.size[j]:
+            i, j = j, i
+        self.parent[j] = i
+        self.size[i] += self.size[j]
+        return True
+
+
+def _bucket_lines(keywords, bands_rows, backend, counts):
+    """Yield chunks of "bucket<TAB>id<TAB>keyword" lines, counting keywords read in counts["keywords"]."""
+    keywords = iter(keywords)
+    while batch := list(itertools.islice(keywords, BUCKET_CHUNK)):
+        start = counts["keywords"]
+        counts["keywords"] += len(batch)
+        sets = [word_set(keyword) for keyword in batch]
+        if bands_rows is None:
+            yield [f"={' '.join(sorted(words))}\t{i:010d}\t{keyword}"
+                   for i, (words, keyword) in enumerate(zip(sets, batch), start)]
+        else:
+            yield [f"{band}:{key:016x}\t{i:010d}\t{keyword}"
+                   for i, (keys, keyword) in enumerate(zip(backend(sets, *bands_rows), batch), start)
+                   for band, key in enumerate(keys)]
+
+
+def _buckets(sorted_lines):
+    for _, group in itertools.groupby(sorted_lines, key=lambda line: line[:line.index("\t")]):
+        yield [(int(i), keyword) for _, i, keyword in (line.split("\t", 2) for line in group)]
+
+
+def cluster(keyword_file, threshold, memory_budget, tmp_dir=None, backend=None):
+    """Cluster the keywords in keyword_file; returns (Clusters, keyword count)."""
+    bands_rows = None if threshold >= 1 else lsh_bands(threshold)
+    backend = backend or signature_backend()
+    counts = {"keywords": 0}
+    lines = external_sort_unique(_bucket_lines(read_lines(keyword_file), bands_rows, backend, counts),
+                                 memory_budget, tmp_dir, render=None)
+    clusters = None
+    for members in _buckets(lines):
+        # The sort reads every keyword before it yields, so the count is final here
+        clusters = clusters or Clusters(counts["keywords"])
+        if len(members) < 2:
+            continue
+        if bands_rows is None:
+            for i, _ in members[1:]:
+                clusters.union(members[0][0], i)
+            continue
+        anchors = []
+        for i, keyword in members:
+            words = word_set(keyword)
+            match = next((j for j, anchor_words in anchors if jaccard(words, anchor_words) >= threshold), None)
+            if match is not None:
+                clusters.union(match, i)
+            elif len(anchors) < MAX_ANCHORS:
+                anchors.append((i, words))
+    return clusters or Clusters(counts["keywords"]), counts["keywords"]
+
+
+def _rank(keyword):
+    """Lower is a better canonical keyword."""
+    return apply_aliases(keyword) != keyword, len(keyword), keyword
+
+
+def write_outputs(keyword_file, clusters, output_base):
+    """Pick each cluster's canonical keyword and write the canonical list and alias map."""
+    best = {}
+    for i, keyword in enumerate(read_lines(keyword_file)):
+        root = clusters.find(i)
+        if clusters.size[root] > 1 and (root not in best or _rank(keyword) < _rank(best[root])):
+            best[root] = keyword
+
+    canonical_file = f"{output_base}.canonical.txt"
+    aliases_file = f"{output_base}.aliases.tsv"
+    kept = aliased = 0
+    with open(canonical_file, "w", encoding="utf-8") as canonical, \
+            open(aliases_file, "w", encoding="utf-8") as aliases:
+        for i, keyword in enumerate(read_lines(keyword_file)):
+            target = best.get(clusters.find(i), keyword)
+            if target == keyword:
+                canonical.write(f"{keyword}\n")
+                kept += 1
+            else:
+                aliases.write(f"{keyword}\t{target}\t{slugify(keyword)}\t{slugify(target)}\n")
+                aliased += 1
+    return kept, aliased, len(best), canonical_file, aliases_file
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Collapse near-duplicate keywords and write an alias map")
+    parser.add_argument("keyword_file", nargs="?", default="keyword_list.txt")
+    parser.add_argument("--threshold", type=float, default=1.0,
+                        help="Jaccard similarity of word sets to merge at; below 1 uses MinHash/LSH (default: 1.0)")
+    parser.add_argument("--output-base", default=None, help="Output path prefix (default: keyword file without .txt)")
+    parser.add_argument("--memory-budget", type=float, default=64, metavar="MB",
+                        help="Sort buffer size before spilling runs to disk (default: 64)")
+    parser.add_argument("--tmp-dir", default=None, help="Directory for spilled sort runs")
+    args = parser.parse_args(argv)
+    if not 0 < args.threshold <= 1:
+        parser.error("--threshold must be in (0, 1]")
+
+    output_base = args.output_base or os.path.splitext(args.keyword_file)[0]
+    started = time.perf_counter()
+    print(f"Clustering {args.keyword_file}...")
+    if args.threshold < 1:
+        bands, rows = lsh_bands(args.threshold)
+        backend = signature_backend()
+        print(f"  MinHash: {bands} bands x {rows} rows "
+              f"({'NumPy' if backend is band_keys_numpy else 'pure Python; pip install numpy for speed'})")
+    clusters, total = cluster(args.keyword_file, args.threshold, int(args.memory_budget * 1024 * 1024),
+                              args.tmp_dir)
+    kept, aliased, groups, canonical_file, aliases_file = write_outputs(args.keyword_file, clusters, output_base)
+
+    print(f"  Keywords: {total:,}")
+    print(f"  Clusters with aliases: {groups:,}")
+    print(f"  Canonical keywords: {kept:,}")
+    if total:
+        print(f"  Aliases: {aliased:,} ({aliased / total:.1%} fewer pages to generate and warm)")
+    print(f"✅ Canonical keywords saved to {canonical_file}")
+    print(f"✅ Alias map saved to {aliases_file}")
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped slug index for the generated keywords
+
+Resolves a URL slug back to its keyword without loading keyword_list.txt.
+The index is one file: a fixed header, a blob of "slug<TAB>keyword" records
+sorted by slug, and a table of record offsets. Opening it only maps the file;
+exact and prefix lookups binary-search the offsets, touching a few pages.
+
+Layout (all integers little-endian):
+  header   magic b"STYLRIDX", version u32, reserved u32, records u64,
+           blob start u64, offsets start u64
+  blob     records back to back, no separators
+  offsets  records + 1 u64 file offsets; record i is offsets[i]..offsets[i+1]
+
+A tab sorts below every character a slug can contain, so sorting records
+sorts slugs, and two keywords with the same slug (e.g. "men's haircut" and
+"mens haircut") sit next to each other.
+
+generate_keywords.py --index builds it in the same run; it can also be built
+from an existing keyword list.
+
+Usage:
+  python scripts/keyword_index.py build keyword_list.txt keyword_list.idx
+  python scripts/keyword_index.py lookup keyword_list.idx box-braids-in-durban
+  python scripts/keyword_index.py prefix keyword_list.idx box-braids-in- [--limit 20]
+"""
+
+import argparse
+import itertools
+import mmap
+import struct
+import sys
+import time
+from array import array
+
+from generate_keywords import atomic_write, external_sort_unique, read_lines, slugify
+
+MAGIC = b"STYLRIDX"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQQ")
+OFFSET = struct.Struct("<Q")
+SEPARATOR = b"\t"
+SORT_CHUNK = 10000
+
+
+class IndexFormatError(ValueError):
+    pass
+
+
+# --- Building ---
+def _records(keywords):
+    """Yield chunks of "slug<TAB>keyword" strings for the external sort."""
+    keywords = iter(keywords)
+    while chunk := [f"{slugify(keyword)}\t{keyword}" for keyword in itertools.islice(keywords, SORT_CHUNK)]:
+        yield chunk
+
+
+def write_index(sorted_records, index_file):
+    """
+    Write already sorted "slug<TAB>keyword" records as an index and return
+    how many there are. Records stream straight into the blob; only their
+    offsets (8 bytes each) are held until the end.
+    """
+    offsets = array("Q")
+    with atomic_write(index_file, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0, 0))
+        blob_start = position = HEADER.size
+        for record in sorted_records:
+            offsets.append(position)
+            data = record.encode("utf-8")
+            f.write(data)
+            position += len(data)
+        offsets.append(position)
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        offsets.tofile(f)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(offsets) - 1, blob_start, position))
+    return len(offsets) - 1
+
+
+def build_index(keywords, index_file, memory_budget, tmp_dir=None):
+    """Slug, sort and index a stream of keywords with bounded memory; returns the record count."""
+    return write_index(external_sort_unique(_records(keywords), memory_budget, tmp_dir, render=None), index_file)
+
+
+# --- Reading ---
+class KeywordIndex:
+    """
+    Read-only view of an index file.
+
+    Lookups decode only the records the binary search visits, so there is
+    no load step however large the index is.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise IndexFormatError(f"{path} is too small to be a keyword index")
+        magic, version, _, self.records, self._blob_start, self._offsets_start = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise IndexFormatError(f"{path} is not a version {VERSION} keyword index")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._map.close()
+
+    def __len__(self):
+        return self.records
+
+    def _offset(self, i):
+        return OFFSET.unpack_from(self._map, self._offsets_start + i * OFFSET.size)[0]
+
+    def _record(self, i):
+        return self._map[self._offset(i):self._offset(i + 1)]
+
+    def _lower_bound(self, key):
+        """First record position whose bytes are >= key."""
+        low, high = 0, self.records
+        while low < high:
+            middle = (low + high) // 2
+            if self._record(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _scan(self, start, prefix):
+        for i in range(start, self.records):
+            record = self._record(i)
+            if not record.startswith(prefix):
+                return
+            slug, _, keyword = record.partition(SEPARATOR)
+            yield slug.decode("utf-8"), keyword.decode("utf-8")
+
+    def lookup(self, slug):
+        """Every keyword whose slug is exactly `slug`, in sorted order."""
+        key = slug.encode("utf-8") + SEPARATOR
+        return [keyword for _, keyword in self._scan(self._lower_bound(key), key)]
+
+    def get(self, slug, default=None):
+        """The first keyword for `slug`, like dict.get."""
+        keywords = self.lookup(slug)
+        return keywords[0] if keywords else default
+
+    def __contains__(self, slug):
+        return bool(self.lookup(slug))
+
+    def prefix(self, prefix, limit=None):
+        """(slug, keyword) pairs whose slug starts with `prefix`, in slug order."""
+        key = prefix.encode("utf-8")
+        return itertools.islice(self._scan(self._lower_bound(key), key), limit)
+
+    def __iter__(self):
+        return self.prefix("")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the memory-mapped keyword slug index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Index an existing keyword list")
+    build.add_argument("keyword_file")
+    build.add_argument("index_file")
+    build.add_argument("--memory-budget", type=float, default=64, metavar="MB",
+                       help="Sort buffer size before spilling runs to disk (default: 64)")
+    build.add_argument("--tmp-dir", default=None, help="Directory for spilled sort runs")
+    lookup = commands.add_parser("lookup", help="Print the keywords for an exact slug")
+    lookup.add_argument("index_file")
+    lookup.add_argument("slug")
+    prefix = commands.add_parser("prefix", help="Print slugs starting with a prefix")
+    prefix.add_argument("index_file")
+    prefix.add_argument("prefix")
+    prefix.add_argument("--limit", type=int, default=20, help="How many to print (default: 20)")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        started = time.perf_counter()
+        count = build_index(read_lines(args.keyword_file), args.index_file,
+                            int(args.memory_budget * 1024 * 1024), args.tmp_dir)
+        print(f"✅ Indexed {count:,} keywords in {time.perf_counter() - started:.1f}s -> {args.index_file}")
+        return
+
+    with KeywordIndex(args.index_file) as index:
+        started = time.perf_counter()
+        if args.command == "lookup":
+            results = [(args.slug, keyword) for keyword in index.lookup(args.slug)]
+        else:
+            results = list(index.prefix(args.prefix, args.limit))
+        elapsed = time.perf_counter() - started
+        for slug, keyword in results:
+            print(f"{slug}\t{keyword}")
+        print(f"{len(results)} result(s) in {elapsed * 1e6:.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Hash-partitioned keyword shards
+
+Splits the sorted keyword stream into N shard files by a stable hash of each
+keyword, so independent workers (page builds, the seo_keywords loader, the
+page warmer) can each take a shard. A keyword's shard depends
+only on the keyword and N, so it never moves when the corpus grows, and jump
+consistent hashing (Lamping & Veach) moves only about 1/N of the keywords
+when a shard is added. Every shard stays sorted.
+
+<dir>/manifest.json lists each shard's keyword count, size and SHA-256. The
+old manifest is removed before any shard is replaced and the new one is
+written last, so a manifest means a complete set. Workers mark a finished
+shard with a part-NNNNN.done file (part-NNNNN.<stage>.done when several
+consumers share the directory) holding the checksum they processed; after
+a crash, or after a rerun that left some shards unchanged, `pending` lists
+only the shards still to do.
+
+generate_keywords.py --shards N writes them in the same run; they can also
+be split from an existing keyword list.
+
+Usage:
+  python scripts/keyword_shards.py split keyword_list.txt keyword_list.shards --shards 16
+  python scripts/keyword_shards.py status keyword_list.shards
+  python scripts/keyword_shards.py verify keyword_list.shards
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import zlib
+from pathlib import Path
+
+from generate_keywords import atomic_write, read_lines
+
+MANIFEST_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+HASH_NAME = "crc32/jump"
+MAX_SHARDS = 4096
+# Encoded lines buffered per shard before one write and checksum update,
+# fewer with many shards so all buffers together stay near BUFFERED_LINES
+FLUSH_LINES = 4096
+BUFFERED_LINES = 65536
+JUMP_MULTIPLIER = 2862933555777941757
+MASK64 = (1 << 64) - 1
+
+
+class ShardError(ValueError):
+    pass
+
+
+# --- Hashing ---
+def stable_hash(keyword):
+    """
+    Hash of the keyword's UTF-8 bytes that, unlike hash(), is the same in
+    every process and run. CRC-32 is several times cheaper per keyword than
+    a cryptographic digest, and jump hashing's multiplier spreads its 32
+    bits evenly over the buckets.
+    """
+    return zlib.crc32(keyword.encode("utf-8"))
+
+
+def jump_hash(key, buckets):
+    """Jump consistent hash: the bucket in [0, buckets) for an integer key below 2**64."""
+    bucket, candidate = -1, 0
+    while candidate < buckets:
+        bucket = candidate
+        key = (key * JUMP_MULTIPLIER + 1) & MASK64
+        candidate = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def shard_of(keyword, shards):
+    return jump_hash(stable_hash(keyword), shards)
+
+
+def parse_shard(value):
+    """argparse type for "K/N": shard K (counting from 0) of N."""
+    try:
+        index, shards = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected K/N, got {value!r}")
+    if not 0 <= index < shards <= MAX_SHARDS:
+        raise argparse.ArgumentTypeError(f"shard {value} is out of range")
+    return index, shards
+
+
+def shard_name(index):
+    return f"part-{index:05d}.txt"
+
+
+# --- Writing ---
+class ShardWriter:
+    """
+    Writes keywords into `shards` files under out_dir, checksumming as it
+    goes, and the manifest when closed. Files are written as .partial and
+    renamed on close, and shards or markers left over from a run with more
+    shards are deleted. A shard's file is only open while a full buffer is
+    appended to it, so thousands of shards need no more file descriptors
+    than one.
+    """
+
+    def __init__(self, out_dir, shards):
+        if not 1 <= shards <= MAX_SHARDS:
+            raise ShardError(f"shards must be between 1 and {MAX_SHARDS}")
+        self.out_dir = Path(out_dir)
+        self.shards = shards
+        self.counts = [0] * shards
+        self.sizes = [0] * shards
+        self._hashers = [hashlib.sha256() for _ in range(shards)]
+        self._buffers = [[] for _ in range(shards)]
+        self._started = [False] * shards
+        self._flush_lines = max(16, min(FLUSH_LINES, BUFFERED_LINES // shards))
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+
+    def _partial_path(self, index):
+        return self.out_dir / f"{shard_name(index)}.partial"
+
+    def _flush(self, index):
+        data = b"".join(self._buffers[index])
+        self._buffers[index].clear()
+        # The first write truncates a .partial left by an interrupted run
+        with open(self._partial_path(index), "ab" if self._started[index] else "wb") as f:
+            f.write(data)
+        self._started[index] = True
+        self._hashers[index].update(data)
+        self.sizes[index] += len(data)
+
+    def add(self, keyword):
+        data = keyword.encode("utf-8")
+        index = jump_hash(zlib.crc32(data), self.shards)
+        buffer = self._buffers[index]
+        buffer.append(data + b"\n")
+        self.counts[index] += 1
+        if len(buffer) >= self._flush_lines:
+            self._flush(index)
+
+    def tap(self, keywords):
+        """Pass keywords through unchanged, adding each to its shard."""
+        # add() inlined: this runs once per keyword of the whole corpus
+        shards, buffers, counts, crc32 = self.shards, self._buffers, self.counts, zlib.crc32
+        flush_lines = self._flush_lines
+        for keyword in keywords:
+            data = keyword.encode("utf-8")
+            key, index, candidate = crc32(data), -1, 0
+            while candidate < shards:
+                index = candidate
+                key = (key * JUMP_MULTIPLIER + 1) & MASK64
+                candidate = int((index + 1) * ((1 << 31) / ((key >> 33) + 1)))
+            buffer = buffers[index]
+            buffer.append(data + b"\n")
+            counts[index] += 1
+            if len(buffer) >= flush_lines:
+                self._flush(index)
+            yield keyword
+
+    def close(self):
+        """Finish every shard, then write the manifest; returns its path."""
+        manifest_path = self.out_dir / MANIFEST_NAME
+        # Drop the old manifest before replacing any shard, so a crash part way
+        # leaves no manifest rather than one vouching for replaced shards
+        manifest_path.unlink(missing_ok=True)
+        for index in range(self.shards):
+            self._flush(index)
+            os.replace(self._partial_path(index), self.out_dir / shard_name(index))
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "hash": HASH_NAME,
+            "shards": self.shards,
+            "keywords": sum(self.counts),
+            "parts": [
+                {"file": shard_name(i), "keywords": self.counts[i], "bytes": self.sizes[i],
+                 "sha256": self._hashers[i].hexdigest()}
+                for i in range(self.shards)
+            ],
+        }
+        with atomic_write(manifest_path) as f:
+            json.dump(manifest, f, indent=2)
+
+        numbered = re.compile(r"part-(\d+)\.(txt|([\w-]+\.)?done)")
+        for path in self.out_dir.iterdir():
+            match = numbered.fullmatch(path.name)
+            if match and int(match.group(1)) >= self.shards:
+                path.unlink()
+        return manifest_path
+
+
+def split(keywords, out_dir, shards):
+    """Shard a keyword stream; returns the manifest path."""
+    with ShardWriter(out_dir, shards) as writer:
+        for keyword in keywords:
+            writer.add(keyword)
+    return writer.out_dir / MANIFEST_NAME
+
+
+# --- Reading ---
+def load_manifest(out_dir):
+    with open(Path(out_dir) / MANIFEST_NAME, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("hash") != HASH_NAME:
+        raise ShardError(f"{out_dir} holds shards from an incompatible version")
+    return manifest
+
+
+def _file_sha256(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def read_shard(out_dir, index, manifest=None, verify=True):
+    """Yield one shard's keywords, after checking it against the manifest unless verify=False."""
+    manifest = manifest or load_manifest(out_dir)
+    part = manifest["parts"][index]
+    path = Path(out_dir) / part["file"]
+    if verify and _file_sha256(path) != part["sha256"]:
+        raise ShardError(f"{path} does not match the manifest")
+    yield from read_lines(path)
+
+
+def _marker_path(out_dir, index, stage=None):
+    suffix = f".{stage}.done" if stage else ".done"
+    return Path(out_dir) / shard_name(index).replace(".txt", suffix)
+
+
+def mark_done(out_dir, index, manifest=None, stage=None):
+    """
+    Record that shard `index`, as the manifest describes it, has been fully
+    processed. Consumers sharing a directory pass their own stage name.
+    """
+    manifest = manifest or load_manifest(out_dir)
+    _marker_path(out_dir, index, stage).write_text(manifest["parts"][index]["sha256"] + "\n", encoding="utf-8")
+
+
+def pending(out_dir, manifest=None, stage=None):
+    """Indices of shards without a done marker (for `stage`) for their current contents."""
+    manifest = manifest or load_manifest(out_dir)
+    result = []
+    for index, part in enumerate(manifest["parts"]):
+        try:
+            done = _marker_path(out_dir, index, stage).read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            done = None
+        if done != part["sha256"]:
+            result.append(index)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Split a keyword list into stable hash shards, or inspect shards")
+    commands = parser.add_subparsers(dest="command", required=True)
+    split_command = commands.add_parser("split", help="Shard an existing keyword list")
+    split_command.add_argument("keyword_file")
+    split_command.add_argument("out_dir")
+    split_command.add_argument("--shards", type=int, required=True, help=f"Number of shards (1-{MAX_SHARDS})")
+    status = commands.add_parser("status", help="Show per-shard counts and which shards are still pending")
+    status.add_argument("out_dir")
+    status.add_argument("--stage", default=None, help="Consumer whose done markers to check, e.g. warm")
+    verify = commands.add_parser("verify", help="Check every shard against the manifest checksums")
+    verify.add_argument("out_dir")
+    args = parser.parse_args(argv)
+
+    if args.command == "split":
+        manifest_path = split(read_lines(args.keyword_file), args.out_dir, args.shards)
+        manifest = load_manifest(args.out_dir)
+        print(f"✅ {manifest['keywords']:,} keywords in {manifest['shards']} shards -> {manifest_path}")
+        return
+
+    manifest = load_manifest(args.out_dir)
+    if args.command == "status":
+        todo = set(pending(args.out_dir, manifest, args.stage))
+        for index, part in enumerate(manifest["parts"]):
+            print(f"  {part['file']}  {part['keywords']:>10,} keywords  {'pending' if index in todo else 'done'}")
+        print(f"{manifest['keywords']:,} keywords in {manifest['shards']} shards, {len(todo)} pending")
+        return
+
+    bad = [part["file"] for part in manifest["parts"]
+           if _file_sha256(Path(args.out_dir) / part["file"]) != part["sha256"]]
+    if bad:
+        print(f"❌ {len(bad)} shard(s) do not match the manifest: {', '.join(bad)}")
+        sys.exit(1)
+    print(f"✅ All {manifest['shards']} shards match the manifest")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Sharded sitemaps for the generated keyword pages
+
+Streams keywords into /<slug> URLs (the frontend [keyword] route) and writes
+them as gzip-compressed sitemap files of at most 50,000 URLs and 50 MB
+uncompressed each, plus a sitemap index that lists them. Only the file being
+written is open, so memory stays flat however many keywords there are.
+
+URLs carry <lastmod> only; search engines ignore <priority> and
+<changefreq>. A slug that repeats the previous keyword's is written once.
+
+generate_keywords.py --sitemap-dir writes them in the same run; they can also
+be built from an existing keyword list. Output is byte-identical for the same
+keywords and --lastmod, so unchanged files can be skipped on deploy.
+
+Usage: python scripts/keyword_sitemap.py keyword_list.txt public/sitemaps [--base-url URL] [--lastmod YYYY-MM-DD]
+"""
+
+import argparse
+import datetime
+import gzip
+import io
+import os
+import re
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from generate_keywords import atomic_write, read_lines, slugify
+
+SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+# Limits from sitemaps.org; the byte limit is for the uncompressed file
+MAX_URLS = 50000
+MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_BASE_URL = os.environ.get("FRONTEND_URL", "https://www.stylrsa.co.za")
+DEFAULT_NAME = "sitemap-keywords"
+# Level 9 is several times slower for a few percent smaller files
+COMPRESS_LEVEL = 6
+
+URLSET_OPEN = f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NAMESPACE}">\n'
+URLSET_CLOSE = "</urlset>\n"
+
+
+class SitemapWriter:
+    """
+    Writes URLs into numbered <name>-<n>.xml.gz files, starting a new file
+    before one would pass max_urls or max_bytes, and <name>.xml as the
+    index when closed.
+    """
+
+    def __init__(self, out_dir, base_url=DEFAULT_BASE_URL, sitemap_base_url=None, lastmod=None,
+                 name=DEFAULT_NAME, max_urls=MAX_URLS, max_bytes=MAX_BYTES):
+        self.out_dir = Path(out_dir)
+        self.base_url = base_url.rstrip("/")
+        self.sitemap_base_url = (sitemap_base_url or base_url).rstrip("/")
+        self.lastmod = lastmod or datetime.date.today().isoformat()
+        self.name = name
+        self.max_urls = max_urls
+        self.max_bytes = max_bytes
+        self.files = []
+        self.urls = 0
+        self._file = None
+        self._raw = None
+        self._file_urls = 0
+        self._file_bytes = 0
+        self._previous_slug = None
+        self._entry = (f"  <url>\n    <loc>{escape(self.base_url)}{{}}</loc>\n"
+                       f"    <lastmod>{self.lastmod}</lastmod>\n  </url>\n").format
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        elif self._file:
+            self._file.close()
+            self._raw.close()
+
+    def _partial_path(self):
+        return self.out_dir / f"{self.files[-1]}.partial"
+
+    def _open(self):
+        self.files.append(f"{self.name}-{len(self.files) + 1}.xml.gz")
+        # mtime=0 keeps the gzip header, and so the file, reproducible
+        self._raw = open(self._partial_path(), "wb")
+        self._file = io.TextIOWrapper(gzip.GzipFile(filename="", mode="wb", fileobj=self._raw,
+                                                    compresslevel=COMPRESS_LEVEL, mtime=0),
+                                      encoding="utf-8", newline="\n")
+        self._file.write(URLSET_OPEN)
+        self._file_urls = 0
+        self._file_bytes = len(URLSET_OPEN) + len(URLSET_CLOSE)
+
+    def _finish(self):
+        self._file.write(URLSET_CLOSE)
+        self._file.close()
+        self._raw.close()
+        os.replace(self._partial_path(), self.out_dir / self.files[-1])
+        self._file = None
+
+    def add(self, path):
+        """Add one URL; `path` is appended to base_url."""
+        self._write(self._entry(escape(path)))
+
+    def add_keyword(self, keyword):
+        slug = slugify(keyword)
+        if slug and slug != self._previous_slug:
+            self._write(self._entry("/" + slug))  # Slugs are [a-z0-9_-], nothing to escape
+        self._previous_slug = slug
+
+    def _write(self, entry):
+        size = len(entry) if entry.isascii() else len(entry.encode("utf-8"))
+        if self._file and (self._file_urls >= self.max_urls or self._file_bytes + size > self.max_bytes):
+            self._finish()
+        if not self._file:
+            self._open()
+        self._file.write(entry)
+        self._file_urls += 1
+        self._file_bytes += size
+        self.urls += 1
+
+    def tap(self, keywords):
+        """Pass keywords through unchanged, adding a URL for each."""
+        for keyword in keywords:
+            self.add_keyword(keyword)
+            yield keyword
+
+    def close(self):
+        """Finish the last sitemap, write the index and delete sitemaps left over from a larger earlier run."""
+        if self._file:
+            self._finish()
+        if len(self.files) > MAX_URLS:
+            raise ValueError(f"{len(self.files)} sitemaps is more than one index can list")
+        index_path = self.out_dir / f"{self.name}.xml"
+        with atomic_write(index_path, newline="\n") as f:
+            f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NAMESPACE}">\n')
+            for file_name in self.files:
+                f.write(f"  <sitemap>\n    <loc>{escape(f'{self.sitemap_base_url}/{file_name}')}</loc>\n"
+                        f"    <lastmod>{self.lastmod}</lastmod>\n  </sitemap>\n")
+            f.write("</sitemapindex>\n")
+
+        numbered = re.compile(rf"{re.escape(self.name)}-(\d+)\.xml\.gz")
+        for path in self.out_dir.iterdir():
+            match = numbered.fullmatch(path.name)
+            if match and int(match.group(1)) > len(self.files):
+                path.unlink()
+        return index_path
+
+
+def valid_date(value):
+    return datetime.date.fromisoformat(value).isoformat()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write sharded, gzipped sitemaps for a keyword list")
+    parser.add_argument("keyword_file")
+    parser.add_argument("out_dir")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL,
+                        help="Site URL for page links (default: $FRONTEND_URL or https://www.stylrsa.co.za)")
+    parser.add_argument("--sitemap-base-url", default=None,
+                        help="URL the sitemap files are served from (default: --base-url)")
+    parser.add_argument("--lastmod", type=valid_date, default=None, help="Date for <lastmod> (default: today)")
+    args = parser.parse_args(argv)
+
+    with SitemapWriter(args.out_dir, args.base_url, args.sitemap_base_url, args.lastmod) as sitemaps:
+        for keyword in read_lines(args.keyword_file):
+            sitemaps.add_keyword(keyword)
+    print(f"✅ {sitemaps.urls:,} URLs in {len(sitemaps.files)} sitemaps -> {args.out_dir}/{sitemaps.name}.xml")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Batched loader for the seo_keywords table
+
+Reads the rows exported by `generate_keywords.py --copy-output` and upserts
+them into seo_keywords in batches (insert, or update slug/category/priority
+when the keyword already exists). Removed keywords from an incremental run
+can be deleted in the same pass, together with their seo_page_cache rows
+(its foreign key is ON DELETE RESTRICT, and a removed keyword's cached page
+is stale anyway). Rows whose slug already belongs to another keyword, e.g.
+one imported by import-seo-keywords.ts, are skipped and reported instead of
+failing their batch. Reports rows per second as it goes. With --shard K/N
+only the keywords in hash shard K of N are loaded (the same split as
+generate_keywords.py --shards), so N loaders can share one export.
+
+Works against PostgreSQL (needs psycopg or psycopg2) or a local SQLite file
+as a stand-in. The backend's Prisma DATABASE_URL works as is: Prisma-only
+query parameters are dropped and ?schema= becomes the search_path.
+--create-table creates seo_keywords, seo_locations and seo_page_cache
+shaped like their Prisma migrations (the SQLite stand-in enforces the same
+foreign keys).
+
+Usage:
+  python scripts/load_seo_keywords.py keywords.tsv --sqlite seo.db --create-table
+  python scripts/load_seo_keywords.py keywords.tsv --database-url "$DATABASE_URL" --batch-size 5000
+  python scripts/load_seo_keywords.py keywords.tsv --database-url "$DATABASE_URL" --shard 0/4
+  python scripts/load_seo_keywords.py keyword_list.added.tsv --delete keyword_list.removed.txt --database-url ...
+  python scripts/load_seo_keywords.py keywords.tsv --database-url ... --conflicts slug_conflicts.tsv
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+import time
+import uuid
+from itertools import islice
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from generate_keywords import COPY_NULL, EXPORT_COLUMNS
+from keyword_shards import parse_shard, shard_of
+
+# PostgreSQL caps a statement at 65535 bind parameters
+POSTGRES_MAX_PARAMS = 65535
+UPSERT_COLUMNS = ["id", "keyword", "slug", "category", "priority"]
+# Query parameters Prisma reads from DATABASE_URL that libpq rejects
+PRISMA_PARAMS = {"schema", "connection_limit", "pool_timeout", "socket_timeout", "pgbouncer",
+                 "statement_cache_size", "sslaccept", "sslidentity", "max_idle_connection_lifetime"}
+REPORT_EVERY = 100000
+
+SQLITE_SCHEMA = (
+    """
+CREATE TABLE IF NOT EXISTS seo_keywords (
+    id TEXT NOT NULL PRIMARY KEY,
+    keyword VARCHAR(255) NOT NULL UNIQUE,
+    slug VARCHAR(255) NOT NULL UNIQUE,
+    category VARCHAR(50) NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 2,
+    search_volume INTEGER,
+    difficulty INTEGER,
+    variations TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL
+)
+""",
+    """
+CREATE TABLE IF NOT EXISTS seo_locations (
+    id TEXT NOT NULL PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    slug VARCHAR(255) NOT NULL,
+    type VARCHAR(50) NOT NULL,
+    province VARCHAR(100) NOT NULL,
+    province_slug VARCHAR(100) NOT NULL,
+    parent_location_id TEXT REFERENCES seo_locations (id) ON DELETE SET NULL ON UPDATE CASCADE,
+    latitude DECIMAL(10,8),
+    longitude DECIMAL(11,8),
+    population INTEGER,
+    service_count INTEGER NOT NULL DEFAULT 0,
+    salon_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL
+)
+""",
+    """
+CREATE TABLE IF NOT EXISTS seo_page_cache (
+    id TEXT NOT NULL PRIMARY KEY,
+    keyword_id TEXT NOT NULL REFERENCES seo_keywords (id) ON DELETE RESTRICT ON UPDATE CASCADE,
+    location_id TEXT NOT NULL REFERENCES seo_locations (id) ON DELETE RESTRICT ON UPDATE CASCADE,
+    url VARCHAR(500) NOT NULL UNIQUE,
+    h1 TEXT NOT NULL,
+    h2_headings TEXT,
+    h3_headings TEXT,
+    intro_text TEXT NOT NULL,
+    meta_title VARCHAR(60) NOT NULL,
+    meta_description VARCHAR(160) NOT NULL,
+    schema_markup TEXT,
+    related_services TEXT,
+    nearby_locations TEXT,
+    service_count INTEGER NOT NULL DEFAULT 0,
+    salon_count INTEGER NOT NULL DEFAULT 0,
+    avg_price DECIMAL(10,2),
+    last_generated TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+""",
+    "CREATE INDEX IF NOT EXISTS seo_page_cache_keyword_id_idx ON seo_page_cache (keyword_id)",
+)
+
+POSTGRES_SCHEMA = (
+    """
+CREATE TABLE IF NOT EXISTS seo_keywords (
+    id TEXT NOT NULL PRIMARY KEY,
+    keyword VARCHAR(255) NOT NULL UNIQUE,
+    slug VARCHAR(255) NOT NULL UNIQUE,
+    category VARCHAR(50) NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 2,
+    search_volume INTEGER,
+    difficulty INTEGER,
+    variations TEXT[],
+    created_at TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP(3) NOT NULL
+)
+""",
+    """
+CREATE TABLE IF NOT EXISTS seo_locations (
+    id TEXT NOT NULL PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    slug VARCHAR(255) NOT NULL,
+    type VARCHAR(50) NOT NULL,
+    province VARCHAR(100) NOT NULL,
+    province_slug VARCHAR(100) NOT NULL,
+    parent_location_id TEXT REFERENCES seo_locations (id) ON DELETE SET NULL ON UPDATE CASCADE,
+    latitude DECIMAL(10,8),
+    longitude DECIMAL(11,8),
+    population INTEGER,
+    service_count INTEGER NOT NULL DEFAULT 0,
+    salon_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP(3) NOT NULL
+)
+""",
+    """
+CREATE TABLE IF NOT EXISTS seo_page_cache (
+    id TEXT NOT NULL PRIMARY KEY,
+    keyword_id TEXT NOT NULL REFERENCES seo_keywords (id) ON DELETE RESTRICT ON UPDATE CASCADE,
+    location_id TEXT NOT NULL REFERENCES seo_locations (id) ON DELETE RESTRICT ON UPDATE CASCADE,
+    url VARCHAR(500) NOT NULL UNIQUE,
+    h1 TEXT NOT NULL,
+    h2_headings TEXT[],
+    h3_headings TEXT[],
+    intro_text TEXT NOT NULL,
+    meta_title VARCHAR(60) NOT NULL,
+    meta_description VARCHAR(160) NOT NULL,
+    schema_markup JSONB,
+    related_services JSONB,
+    nearby_locations JSONB,
+    service_count INTEGER NOT NULL DEFAULT 0,
+    salon_count INTEGER NOT NULL DEFAULT 0,
+    avg_price DECIMAL(10,2),
+    last_generated TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+""",
+    "CREATE INDEX IF NOT EXISTS seo_page_cache_keyword_id_idx ON seo_page_cache (keyword_id)",
+)
+
+SQLITE_HAS_TABLE = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?"
+POSTGRES_HAS_TABLE = "SELECT to_regclass(%s) IS NOT NULL"
+
+UPSERT_CONFLICT = """
+ON CONFLICT (keyword) DO UPDATE SET
+    slug = excluded.slug,
+    category = excluded.category,
+    priority = excluded.priority,
+    updated_at = excluded.updated_at
+"""
+
+
+def read_rows(path, row_format):
+    """Yield export rows as dicts keyed by EXPORT_COLUMNS."""
+    with open(path, encoding="utf-8", newline="") as f:
+        if row_format == "csv":
+            for row in csv.DictReader(f):
+                yield {column: row[column] or None for column in EXPORT_COLUMNS}
+        else:
+            for line in f:
+                values = line.rstrip("\n").split("\t")
+                yield {column: None if value == COPY_NULL else value
+                       for column, value in zip(EXPORT_COLUMNS, values)}
+
+
+def read_keywords(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            keyword = line.rstrip("\n")
+            if keyword:
+                yield keyword
+
+
+def libpq_url(url):
+    """
+    Split a Prisma DATABASE_URL (postgresql://...?schema=public) into a URL
+    libpq accepts and the schema to use as search_path, or None.
+    """
+    parts = urlsplit(url)
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    schema = next((value for name, value in params if name == "schema"), None)
+    query = urlencode([(name, value) for name, value in params if name not in PRISMA_PARAMS])
+    return urlunsplit(parts._replace(query=query)), schema or None
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Database:
+    """The small slice of DB-API differences the loader cares about."""
+
+    def __init__(self, connection, placeholder, schema, empty_variations, has_table, max_batch=None):
+        self.connection = connection
+        self.placeholder = placeholder
+        self.schema = schema
+        self.empty_variations = empty_variations
+        self.has_table = has_table
+        self.max_batch = max_batch
+        # (keyword, slug, keyword that already owns the slug) for every skipped row
+        self.slug_conflicts = []
+        self.cached_pages_deleted = 0
+        self._page_cache = None
+
+    @classmethod
+    def sqlite(cls, path):
+        connection = sqlite3.connect(path)
+        # Enforce seo_page_cache's foreign keys the way PostgreSQL does
+        connection.execute("PRAGMA foreign_keys = ON")
+        return cls(connection, "?", SQLITE_SCHEMA, "'{}'", SQLITE_HAS_TABLE)
+
+    @classmethod
+    def postgres(cls, url):
+        try:
+            import psycopg
+        except ImportError:
+            try:
+                import psycopg2 as psycopg
+            except ImportError:
+                raise SystemExit("PostgreSQL loading needs psycopg (pip install 'psycopg[binary]') or psycopg2")
+        url, schema = libpq_url(url)
+        connection = psycopg.connect(url)
+        if schema:
+            identifier = '"' + schema.replace('"', '""') + '"'
+            connection.cursor().execute(f"SET search_path TO {identifier}")
+            connection.commit()
+        max_batch = POSTGRES_MAX_PARAMS // len(UPSERT_COLUMNS)
+        return cls(connection, "%s", POSTGRES_SCHEMA, "ARRAY[]::text[]", POSTGRES_HAS_TABLE, max_batch)
+
+    def create_table(self):
+        cursor = self.connection.cursor()
+        for statement in self.schema:
+            cursor.execute(statement)
+        self.connection.commit()
+
+    def _marks(self, count):
+        return ", ".join([self.placeholder] * count)
+
+    def _skip_slug_conflicts(self, rows, cursor):
+        """
+        Drop rows whose slug belongs to another keyword, in the table or earlier
+        in the batch: slug is UNIQUE too, and ON CONFLICT (keyword) cannot
+        resolve that, so one such row would fail the whole batch.
+        """
+        slugs = list({row["slug"] for row in rows})
+        cursor.execute(f"SELECT slug, keyword FROM seo_keywords WHERE slug IN ({self._marks(len(slugs))})", slugs)
+        owners = dict(cursor.fetchall())
+        kept = []
+        for row in rows:
+            owner = owners.setdefault(row["slug"], row["keyword"])
+            if owner == row["keyword"]:
+                kept.append(row)
+            else:
+                self.slug_conflicts.append((row["keyword"], row["slug"], owner))
+        return kept
+
+    def upsert(self, rows):
+        """Insert or update one batch in a single transaction; returns the rows written."""
+        cursor = self.connection.cursor()
+        rows = self._skip_slug_conflicts(rows, cursor)
+        params = [(str(uuid.uuid4()), row["keyword"], row["slug"], row["category"], int(row["priority"]))
+                  for row in rows]
+        row_sql = "(" + ", ".join([self.placeholder] * len(UPSERT_COLUMNS)
+                                  + [self.empty_variations, "CURRENT_TIMESTAMP"]) + ")"
+        insert = f"INSERT INTO seo_keywords ({', '.join(UPSERT_COLUMNS)}, variations, updated_at) VALUES "
+        if self.max_batch and params:
+            # One multi-row statement per batch is far cheaper than a round trip per row
+            cursor.execute(insert + ", ".join([row_sql] * len(params)) + UPSERT_CONFLICT,
+                           [value for row in params for value in row])
+        elif params:
+            cursor.executemany(insert + row_sql + UPSERT_CONFLICT, params)
+        self.connection.commit()
+        return len(params)
+
+    def delete(self, keywords):
+        """
+        Delete one batch of keywords and their cached pages in a single
+        transaction; returns the keywords actually deleted.
+        """
+        cursor = self.connection.cursor()
+        marks = self._marks(len(keywords))
+        if self._page_cache is None:
+            cursor.execute(self.has_table, ("seo_page_cache",))
+            self._page_cache = bool((cursor.fetchone() or [False])[0])
+        if self._page_cache:
+            # seo_page_cache.keyword_id is ON DELETE RESTRICT
+            cursor.execute("DELETE FROM seo_page_cache WHERE keyword_id IN "
+                           f"(SELECT id FROM seo_keywords WHERE keyword IN ({marks}))", keywords)
+            self.cached_pages_deleted += cursor.rowcount
+        cursor.execute(f"DELETE FROM seo_keywords WHERE keyword IN ({marks})", keywords)
+        self.connection.commit()
+        return cursor.rowcount
+
+
+def _report(action, done, started):
+    elapsed = time.perf_counter() - started
+    rate = done / elapsed if elapsed else 0
+    print(f"  {action}: {done:,} rows ({rate:,.0f} rows/s)")
+
+
+def _run_batches(action, apply, items, batch_size):
+    """Apply each batch; returns (rows apply reports as changed, seconds)."""
+    started = time.perf_counter()
+    done = 0
+    for batch in batched(items, batch_size):
+        changed = apply(batch)
+        if (done + changed) // REPORT_EVERY > done // REPORT_EVERY:
+            _report(action, done + changed, started)
+        done += changed
+    return done, time.perf_counter() - started
+
+
+def load(db, rows, batch_size):
+    return _run_batches("Upserted", db.upsert, rows, batch_size)
+
+
+def delete(db, keywords, batch_size):
+    return _run_batches("Deleted", db.delete, keywords, batch_size)
+
+
+def report_conflicts(conflicts, path=None):
+    if not conflicts:
+        return
+    print(f"⚠️  Skipped {len(conflicts):,} keywords whose slug belongs to another keyword:")
+    for keyword, slug, owner in conflicts[:5]:
+        print(f"    {keyword!r} -> {slug} (owned by {owner!r})")
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(f"{keyword}\t{slug}\t{owner}\n" for keyword, slug, owner in conflicts)
+        print(f"    Full list written to {path}")
+    elif len(conflicts) > 5:
+        print("    ... pass --conflicts PATH for the full list")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Upsert exported keyword rows into seo_keywords")
+    parser.add_argument("rows", nargs="?", help="Rows from generate_keywords.py --copy-output")
+    parser.add_argument("--format", choices=["tsv", "csv"], default="tsv", help="Row file format (default: tsv)")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--sqlite", metavar="PATH", help="Load into a local SQLite database instead of PostgreSQL")
+    target.add_argument("--database-url", default=os.environ.get("DATABASE_URL"),
+                        help="PostgreSQL connection URL (default: $DATABASE_URL)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per transaction (default: 5000)")
+    parser.add_argument("--delete", metavar="PATH", help="Plain keyword list to delete, e.g. keyword_list.removed.txt")
+    parser.add_argument("--create-table", action="store_true",
+                        help="Create seo_keywords, seo_locations and seo_page_cache if they do not exist")
+    parser.add_argument("--conflicts", metavar="PATH",
+                        help="Write rows skipped for a slug owned by another keyword here (keyword, slug, owner)")
+    parser.add_argument("--shard", type=parse_shard, default=None, metavar="K/N",
+                        help="Only load and delete keywords in hash shard K of N (see keyword_shards.py)")
+    args = parser.parse_args(argv)
+
+    if not args.rows and not args.delete:
+        parser.error("nothing to do: pass a rows file and/or --delete")
+    if args.sqlite:
+        db = Database.sqlite(args.sqlite)
+    elif args.database_url:
+        db = Database.postgres(args.database_url)
+    else:
+        parser.error("pass --sqlite PATH or --database-url (or set DATABASE_URL)")
+
+    batch_size = args.batch_size
+    if db.max_batch and batch_size > db.max_batch:
+        print(f"Batch size capped at {db.max_batch} (PostgreSQL parameter limit)")
+        batch_size = db.max_batch
+
+    if args.create_table:
+        db.create_table()
+
+    if args.shard:
+        print(f"Loading SEO keywords, shard {args.shard[0]} of {args.shard[1]}...")
+    else:
+        print("Loading SEO keywords...")
+    if args.delete:
+        keywords = read_keywords(args.delete)
+        if args.shard:
+            keywords = (keyword for keyword in keywords if shard_of(keyword, args.shard[1]) == args.shard[0])
+        done, elapsed = delete(db, keywords, batch_size)
+        print(f"✅ Deleted {done:,} keywords and {db.cached_pages_deleted:,} cached pages in {elapsed:.1f}s")
+    if args.rows:
+        rows = read_rows(args.rows, args.format)
+        if args.shard:
+            rows = (row for row in rows if shard_of(row["keyword"], args.shard[1]) == args.shard[0])
+        done, elapsed = load(db, rows, batch_size)
+        rate = done / elapsed if elapsed else 0
+        print(f"✅ Upserted {done:,} keywords in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+        report_conflicts(db.slug_conflicts, args.conflicts)
+    db.connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Location catalog for the SEO scripts
+
+Reads `locationsData` from backend/src/locations/locations.data.ts and
+`PROVINCES` from frontend/src/lib/locationData.ts with a small tokenizer for
+the object/array/string literals those files use, and merges them into one
+catalog of provinces and locations. Parsed files are cached on disk, keyed by
+mtime, size and content hash, so repeat loads take milliseconds.
+
+The catalog's slug index reports locations that appear in more than one
+province (e.g. 'vryburg', 'richmond') and repeats within a province.
+
+Usage: python scripts/location_catalog.py [--no-cache] [--json catalog.json]
+"""
+
+import argparse
+import hashlib
+import json
+import re
+from collections import defaultdict
+from pathlib import Path
+
+from generate_keywords import atomic_write
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BACKEND_LOCATIONS = REPO_ROOT / "backend" / "src" / "locations" / "locations.data.ts"
+FRONTEND_LOCATIONS = REPO_ROOT / "frontend" / "src" / "lib" / "locationData.ts"
+DEFAULT_CACHE = Path(__file__).resolve().parent / ".cache" / "location_catalog.json"
+CACHE_VERSION = 1
+
+# --- Tokenizer ---
+TOKEN_RE = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*"|`(?:[^`\\$]|\\.)*`)
+  | (?P<number>-?\d+(?:\.\d+)?)
+  | (?P<name>[A-Za-z_$][\w$]*)
+  | (?P<punct>[{}\[\]():;,=<>|?.&*!+\-/])
+""", re.VERBOSE | re.DOTALL)
+ESCAPE_RE = re.compile(r"\\(u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|\n|.)")
+SIMPLE_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "0": "\0", "\n": ""}
+
+
+class TypeScriptSyntaxError(ValueError):
+    pass
+
+
+def _unescape(match):
+    escape = match.group(1)
+    if escape[0] in "ux" and len(escape) > 1:
+        return chr(int(escape[1:].strip("{}"), 16))
+    return SIMPLE_ESCAPES.get(escape, escape)
+
+
+def tokenize(source):
+    """Yield (kind, value, offset) tokens, skipping whitespace and comments."""
+    pos = 0
+    while pos < len(source):
+        match = TOKEN_RE.match(source, pos)
+        if not match:
+            line = source.count("\n", 0, pos) + 1
+            raise TypeScriptSyntaxError(f"unexpected character {source[pos]!r} on line {line}")
+        kind = match.lastgroup
+        if kind == "string":
+            yield kind, ESCAPE_RE.sub(_unescape, match.group()[1:-1]), pos
+        elif kind not in ("space", "comment"):
+            yield kind, match.group(), pos
+        pos = match.end()
+
+
+# --- Literal Parser ---
+class _Parser:
+    """
+    Recursive-descent parser for JSON-like TypeScript literals.
+
+    Tokens are pulled lazily, so code after the literal (functions, regex
+    literals, ...) is never tokenized.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.tokens = tokenize(source)
+        self.current = next(self.tokens, None)
+
+    def error(self, message):
+        offset = self.current[2] if self.current else len(self.source)
+        line = self.source.count("\n", 0, offset) + 1
+        return TypeScriptSyntaxError(f"{message} on line {line}")
+
+    def peek(self):
+        return self.current[:2] if self.current else (None, None)
+
+    def take(self, value=None):
+        kind, token = self.peek()
+        if kind is None or (value is not None and token != value):
+            raise self.error(f"expected {value or 'a token'}, found {token!r}")
+        self.current = next(self.tokens, None)
+        return kind, token
+
+    def value(self):
+        kind, token = self.peek()
+        if token == "{":
+            return self.object()
+        if token == "[":
+            return self.array()
+        self.take()
+        if kind == "string":
+            return token
+        if kind == "number":
+            return float(token) if "." in token else int(token)
+        if kind == "name" and token in ("true", "false", "null", "undefined"):
+            return {"true": True, "false": False}.get(token)
+        raise self.error(f"unsupported value {token!r}")
+
+    def object(self):
+        self.take("{")
+        result = {}
+        while self.peek()[1] != "}":
+            kind, key = self.take()
+            if kind not in ("name", "string", "number"):
+                raise self.error(f"unsupported object key {key!r}")
+            self.take(":")
+            result[key] = self.value()
+            if self.peek()[1] != "}":
+                self.take(",")
+        self.take("}")
+        return result
+
+    def array(self):
+        self.take("[")
+        result = []
+        while self.peek()[1] != "]":
+            result.append(self.value())
+            if self.peek()[1] != "]":
+                self.take(",")
+        self.take("]")
+        return result
+
+
+def extract_constant(source, name):
+    """Return the literal value assigned to `const name` (type annotations are skipped)."""
+    declaration = re.search(rf"\b(?:const|let|var)\s+{re.escape(name)}\b[^=]*=", source)
+    if not declaration:
+        raise KeyError(f"no constant named {name}")
+    parser = _Parser(source)
+    while parser.current and parser.current[2] < declaration.end():
+        parser.take()
+    return parser.value()
+
+
+# --- Cache ---
+def _file_key(path):
+    stat = path.stat()
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _sha256(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def load_constant(path, name, cache):
+    """Parse a constant from a TypeScript file, reusing cache entries whose file is unchanged."""
+    cache_key = f"{path}:{name}"
+    key = _file_key(path)
+    entry = cache.get(cache_key)
+    if entry and {k: entry[k] for k in key} == key:
+        return entry["value"]
+    digest = _sha256(path)
+    if entry and entry["sha256"] == digest:
+        entry.update(key)  # Touched but not changed
+        return entry["value"]
+    value = extract_constant(path.read_text(encoding="utf-8"), name)
+    cache[cache_key] = {**key, "sha256": digest, "value": value}
+    return value
+
+
+def _read_cache(cache_path):
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache.get("files", {}) if cache.get("version") == CACHE_VERSION else {}
+
+
+def _write_cache(cache_path, files):
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(cache_path) as f:
+        json.dump({"version": CACHE_VERSION, "files": files}, f, ensure_ascii=False)
+
+
+# --- Catalog ---
+def generate_slug(text):
+    """Same rules as generateSlug() in frontend/src/lib/locationData.ts."""
+    return re.sub(r"[^a-z0-9-]", "", re.sub(r"\s+", "-", text.lower()))
+
+
+def split_alias(name):
+    """'Amanzimtoti (eManzimtoti)' -> ('Amanzimtoti', 'eManzimtoti')."""
+    match = re.fullmatch(r"(.+?)\s*\((.+)\)", name)
+    return (match.group(1), match.group(2)) if match else (name, None)
+
+
+class Catalog:
+    """
+    Provinces and locations merged from every source.
+
+    Each location is a dict with name, slug, province, province_slug,
+    aliases and occurrences, the number of times each source listed it, so
+    repeats inside one province stay visible after the merge.
+    """
+
+    def __init__(self):
+        self.provinces = {}
+        self.locations = []
+        self._by_key = {}
+
+    def add_province(self, name, slug=None):
+        slug = slug or generate_slug(name)
+        self.provinces.setdefault(slug, {"slug": slug, "name": name})
+        return slug
+
+    def add(self, source, province_slug, name, slug=None):
+        name, alias = split_alias(name)
+        slug = slug or generate_slug(name)
+        key = (province_slug, slug)
+        location = self._by_key.get(key)
+        if location is None:
+            location = {
+                "name": name,
+                "slug": slug,
+                "province": self.provinces[province_slug]["name"],
+                "province_slug": province_slug,
+                "aliases": [],
+                "occurrences": {},
+            }
+            self._by_key[key] = location
+            self.locations.append(location)
+        if alias and alias not in location["aliases"]:
+            location["aliases"].append(alias)
+        location["occurrences"][source] = location["occurrences"].get(source, 0) + 1
+        return location
+
+    def names(self, province_slug=None):
+        """Location names in catalog order, optionally for one province."""
+        return [loc["name"] for loc in self.locations
+                if province_slug is None or loc["province_slug"] == province_slug]
+
+    def slug_index(self):
+        index = defaultdict(list)
+        for location in self.locations:
+            index[location["slug"]].append(location)
+        return dict(index)
+
+    def cross_province_duplicates(self):
+        return {slug: sorted(loc["province_slug"] for loc in entries)
+                for slug, entries in self.slug_index().items() if len(entries) > 1}
+
+    def in_province_repeats(self):
+        return [(loc["province_slug"], loc["slug"], source, count)
+                for loc in self.locations
+                for source, count in loc["occurrences"].items() if count > 1]
+
+
+def build_catalog(backend_data, frontend_provinces):
+    """Frontend entries come first (curated, major cities first), then backend-only locations."""
+    catalog = Catalog()
+    for province_slug, province in frontend_provinces.items():
+        catalog.add_province(province["name"], province_slug)
+        for city in province["cities"]:
+            catalog.add("frontend", province_slug, city["name"], city["slug"])
+    for province_name, names in backend_data.items():
+        province_slug = catalog.add_province(province_name)
+        for name in names:
+            catalog.add("backend", province_slug, name)
+    return catalog
+
+
+def load_sources(cache_path=DEFAULT_CACHE, use_cache=True,
+                 backend_path=BACKEND_LOCATIONS, frontend_path=FRONTEND_LOCATIONS):
+    """Return the raw (locationsData, PROVINCES) values from the TypeScript files."""
+    cache = _read_cache(cache_path) if use_cache else {}
+    before = json.dumps(cache, sort_keys=True) if use_cache else None
+    backend_data = load_constant(Path(backend_path), "locationsData", cache)
+    frontend_provinces = load_constant(Path(frontend_path), "PROVINCES", cache)
+    if use_cache and json.dumps(cache, sort_keys=True) != before:
+        _write_cache(cache_path, cache)
+    return backend_data, frontend_provinces
+
+
+def load_catalog(cache_path=DEFAULT_CACHE, use_cache=True,
+                 backend_path=BACKEND_LOCATIONS, frontend_path=FRONTEND_LOCATIONS):
+    return build_catalog(*load_sources(cache_path, use_cache, backend_path, frontend_path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the location catalog from the TypeScript data files")
+    parser.add_argument("--no-cache", action="store_true", help="Parse the TypeScript files even if cached")
+    parser.add_argument("--json", dest="json_path", help="Write the catalog as JSON")
+    args = parser.parse_args(argv)
+
+    catalog = load_catalog(use_cache=not args.no_cache)
+
+    print("Location catalog")
+    print("=" * 60)
+    print(f"Provinces: {len(catalog.provinces)}")
+    print(f"Locations: {len(catalog.locations)}")
+    for slug, province in catalog.provinces.items():
+        print(f"  {province['name']}: {len(catalog.names(slug))}")
+    print()
+
+    duplicates = catalog.cross_province_duplicates()
+    print(f"Slugs in more than one province: {len(duplicates)}")
+    for slug, provinces in sorted(duplicates.items()):
+        print(f"  - {slug}: {', '.join(provinces)}")
+    repeats = catalog.in_province_repeats()
+    print(f"Repeats within a province: {len(repeats)}")
+    for province_slug, slug, source, count in repeats:
+        print(f"  - {slug} ({province_slug}): listed {count}x in {source}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"provinces": catalog.provinces, "locations": catalog.locations}, f,
+                      indent=2, ensure_ascii=False)
+        print(f"✅ Catalog saved to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
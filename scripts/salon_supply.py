@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Salon supply around each keyword location
+
+Loads an export of salon coordinates (the latitude/longitude columns of the
+salons table, as JSON or CSV) and location centroids (e.g. an export of
+seo_locations with name, latitude and longitude), buckets the salons in a
+grid of cells at least --radius km wide and works out, for every location,
+which services a salon within the radius offers. generate_keywords.py
+--salons uses it to skip "[service] in [location]" pages with no supply.
+
+Each query only looks at the 3x3 cells around the centroid and checks the
+exact great-circle distance of the salons in them, so tens of thousands of
+salons and thousands of locations take well under a second.
+
+Salon rows may have a services column (a JSON list, or names separated by
+";" in CSV) naming the keyword services they offer; a salon without one
+counts for every service. Rows with a status other than APPROVED, or
+without coordinates, are skipped. Centroids are matched to keyword
+locations by slug, and locations without a centroid are never pruned.
+
+Usage: python scripts/salon_supply.py salons.json centroids.csv [--radius 50] [--catalog]
+"""
+
+import argparse
+import csv
+import json
+import math
+import time
+from collections import defaultdict
+
+from location_catalog import generate_slug
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+DEFAULT_RADIUS_KM = 50
+# Widens grid cells slightly so rounding can never push a salon that is
+# within the radius outside the 3x3 cells around a query
+CELL_MARGIN = 1.01
+# The 3x3 cells around a query, its own cell first
+NEIGHBOURS = sorted(((row, column) for row in (-1, 0, 1) for column in (-1, 0, 1)),
+                    key=lambda offset: abs(offset[0]) + abs(offset[1]))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GridIndex:
+    """
+    Points bucketed by latitude/longitude cell. Cells are at least radius_km
+    across, also east-west at the highest latitude a neighbour can have, so
+    every point within radius_km of a query is in the 3x3 cells around it.
+    """
+
+    def __init__(self, points, radius_km):
+        points = list(points)
+        self.radius_km = radius_km
+        self.cell_lat = radius_km / KM_PER_DEGREE * CELL_MARGIN
+        highest = min(89.0, max((abs(lat) for lat, _, _ in points), default=0.0) + self.cell_lat)
+        self.cell_lon = min(360.0, self.cell_lat / math.cos(math.radians(highest)))
+        self.cells = defaultdict(list)
+        for lat, lon, payload in points:
+            self.cells[self._cell(lat, lon)].append((lat, lon, payload))
+        self.points = len(points)
+
+    def _cell(self, lat, lon):
+        return math.floor(lat / self.cell_lat), math.floor(lon / self.cell_lon)
+
+    def within(self, lat, lon):
+        """Yield the payload of every point within radius_km of (lat, lon), its own cell first."""
+        row, column = self._cell(lat, lon)
+        for d_row, d_column in NEIGHBOURS:
+            for point_lat, point_lon, payload in self.cells.get((row + d_row, column + d_column), ()):
+                if haversine_km(lat, lon, point_lat, point_lon) <= self.radius_km:
+                    yield payload
+
+
+# --- Loading ---
+def read_rows(path):
+    """Rows of a JSON list of objects or a CSV file with a header."""
+    with open(path, encoding="utf-8", newline="") as f:
+        if str(path).endswith(".csv"):
+            return list(csv.DictReader(f))
+        rows = json.load(f)
+    if not isinstance(rows, list):
+        raise ValueError(f"{path} should hold a JSON list of objects")
+    return rows
+
+
+def _coordinates(row):
+    try:
+        lat, lon = float(row["latitude"]), float(row["longitude"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return (lat, lon) if -90 <= lat <= 90 and -180 <= lon <= 180 else None
+
+
+def load_salons(path, services):
+    """
+    Return ([(lat, lon, offered services or None)], skipped rows, unknown
+    service names). None means the salon did not list services and counts
+    for all of them.
+    """
+    by_name = {service.lower(): service for service in services}
+    salons, skipped, unknown = [], 0, set()
+    for row in read_rows(path):
+        coordinates = _coordinates(row)
+        if coordinates is None or (row.get("status") or "APPROVED") != "APPROVED":
+            skipped += 1
+            continue
+        listed = row.get("services") or []
+        if isinstance(listed, str):
+            listed = [name.strip() for name in listed.split(";") if name.strip()]
+        offered = None
+        if listed:
+            offered = frozenset(by_name[name.lower()] for name in listed if name.lower() in by_name)
+            unknown.update(name for name in listed if name.lower() not in by_name)
+        salons.append((*coordinates, offered))
+    return salons, skipped, sorted(unknown)
+
+
+def load_centroids(path, locations):
+    """Return ({location: (lat, lon)}, centroid names matching no location), matching names by slug."""
+    by_slug = {generate_slug(location): location for location in locations}
+    centroids, unmatched = {}, []
+    for row in read_rows(path):
+        coordinates = _coordinates(row)
+        location = by_slug.get(generate_slug(str(row.get("name", ""))))
+        if location is None or coordinates is None:
+            unmatched.append(str(row.get("name", "")))
+        else:
+            centroids.setdefault(location, coordinates)
+    return centroids, unmatched
+
+
+def supply_by_location(salons, centroids, radius_km, services):
+    """{location: set of services offered within radius_km of its centroid}, for every location with a centroid."""
+    index = GridIndex(salons, radius_km)
+    every_service = frozenset(services)
+    supply = {}
+    for location, (lat, lon) in centroids.items():
+        available = set()
+        for offered in index.within(lat, lon):
+            available |= every_service if offered is None else offered
+            if len(available) == len(every_service):
+                break
+        supply[location] = available
+    return supply
+
+
+def load_supply(salons_path, centroids_path, radius_km, services, locations):
+    """Load both exports and return (supply, report) for generate_keywords.py."""
+    salons, skipped, unknown_services = load_salons(salons_path, services)
+    centroids, unmatched = load_centroids(centroids_path, locations)
+    supply = supply_by_location(salons, centroids, radius_km, services)
+    report = {
+        "salons": len(salons),
+        "skipped_salons": skipped,
+        "unknown_services": unknown_services,
+        "unmatched_centroids": unmatched,
+        "locations": len(locations),
+        "with_centroid": len(supply),
+        "with_supply": sum(1 for available in supply.values() if available),
+    }
+    return supply, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report salon supply within a radius of each keyword location")
+    parser.add_argument("salons", help="JSON or CSV export of salons with latitude/longitude (and optional services)")
+    parser.add_argument("centroids", help="JSON or CSV of location name, latitude, longitude")
+    parser.add_argument("--radius", type=float, default=DEFAULT_RADIUS_KM, metavar="KM",
+                        help=f"Search radius around each location (default: {DEFAULT_RADIUS_KM})")
+    parser.add_argument("--catalog", action="store_true",
+                        help="Check the location catalog instead of the generator's location list")
+    args = parser.parse_args(argv)
+
+    import generate_keywords as gk
+    locations = gk.DIMENSIONS["location"]
+    if args.catalog:
+        from location_catalog import load_catalog
+        locations = gk.canonical(load_catalog().names())
+
+    started = time.perf_counter()
+    supply, report = load_supply(args.salons, args.centroids, args.radius, gk.DIMENSIONS["service"], locations)
+    elapsed = time.perf_counter() - started
+
+    print(f"Salons: {report['salons']:,} ({report['skipped_salons']:,} skipped: not approved or no coordinates)")
+    print(f"Locations: {report['locations']:,}, {report['with_centroid']:,} with a centroid")
+    print(f"Locations with a salon within {args.radius:g} km: {report['with_supply']:,}")
+    empty = sorted(location for location, available in supply.items() if not available)
+    print(f"Locations without supply: {len(empty)}")
+    for location in empty:
+        print(f"  - {location}")
+    if report["unmatched_centroids"]:
+        print(f"Centroids matching no location: {len(report['unmatched_centroids'])}")
+    if report["unknown_services"]:
+        print(f"Unknown service names: {', '.join(report['unknown_services'][:10])}")
+    print(f"Done in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The scripts import each other as top-level modules, as they do when run from scripts/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import generate_keywords as gk  # noqa: E402
+
+
+@pytest.fixture
+def restore_spec():
+    """Put back the generator's module-level spec, selection and supply after a test changes them."""
+    spec = {"dimensions": dict(gk.KEYWORD_SPEC["dimensions"]), "types": list(gk.KEYWORD_SPEC["types"])}
+    yield
+    gk.set_spec(spec)
+    gk.SELECTED.clear()
+    gk.SUPPLY.clear()
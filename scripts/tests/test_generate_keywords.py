@@ -0,0 +1,90 @@
+import json
+import random
+
+import generate_keywords as gk
+from keyword_cardinality import dedup_counts
+
+LITERAL_SPEC = {"types": [{"label": "T1", "priority": 1,
+                           "templates": ["{service} in {location_top30}", "Stylr SA reviews"]}]}
+
+
+def set_override(override):
+    gk.set_spec({"dimensions": {**gk.KEYWORD_SPEC["dimensions"], **override.get("dimensions", {})},
+                 "types": override.get("types", gk.KEYWORD_SPEC["types"])})
+
+
+def type_keywords(type_number, shards=1):
+    return [gk.render_code(code) for shard in range(shards)
+            for chunk in gk.type_code_ranges(type_number, shard, shards) for code in chunk]
+
+
+def test_literal_only_template_is_one_keyword(restore_spec):
+    set_override(LITERAL_SPEC)
+    keywords = type_keywords(1)
+    assert keywords.count("Stylr SA reviews") == 1
+    assert sorted(type_keywords(1, shards=3)) == sorted(keywords)
+    assert sum(result["unique"] for result in dedup_counts(gk.TEMPLATES)) == len(set(keywords))
+
+
+def test_sharded_code_ranges_cover_each_code_once():
+    for type_number in range(1, len(gk.KEYWORD_TYPES) + 1):
+        whole = [code for chunk in gk.type_code_ranges(type_number) for code in chunk]
+        shards = [list(gk.type_code_ranges(type_number, shard, 3)) for shard in range(3)]
+        assert sorted(code for ranges in shards for chunk in ranges for code in chunk) == sorted(whole)
+
+
+def test_trailing_location_is_not_one_range_per_keyword():
+    # Type 2 ("{prefix} {service} in {location}") has the shard axis last
+    assert len(list(gk.type_code_ranges(2))) == 1
+    assert len(list(gk.type_code_ranges(2, 0, 3))) < 10000 < gk.TEMPLATES[1].size
+
+
+def test_shared_keywords_credit_the_lowest_type_past_nine(restore_spec):
+    types = [{"label": f"T{n}", "priority": 1, "templates": [f"{{service}} x{n}"]} for n in range(1, 10)]
+    types[1]["templates"] = ["{service} in {location_top30}"]
+    types.append({"label": "T10", "priority": 1, "templates": ["{service} in {location_top40}"]})
+    set_override({"types": types})
+    lines = sorted(gk.render_tagged(code) for n in range(1, 11)
+                   for chunk in gk.type_code_ranges(n) for code in chunk)
+    unique = dict.fromkeys(range(1, 11), 0)
+    keywords = list(gk._count_types(lines, unique, strip=True))
+    assert len(keywords) == len(set(keywords))
+    assert [unique[n] for n in range(1, 11)] == [
+        result["unique"] for result in dedup_counts(gk.TEMPLATES)]
+    assert unique[2] == gk.TEMPLATES[1].size
+
+
+def test_external_sort_matches_sorted_set(tmp_path, monkeypatch):
+    monkeypatch.setattr(gk, "MAX_MERGE_FANIN", 3)  # Force merge passes as well as spills
+    rng = random.Random(7)
+    words = [f"word {rng.randrange(500)}" for _ in range(3000)]
+    chunks = [words[i:i + 97] for i in range(0, len(words), 97)]
+    for budget in (gk.BYTES_PER_KEYWORD * 50, 10**9):
+        assert list(gk.external_sort_unique(iter(chunks), budget, tmp_path, render=None)) == sorted(set(words))
+    codes = [range(0, 4000), range(2000, 6000, 3)]
+    assert list(gk.external_sort_unique(codes, gk.BYTES_PER_KEYWORD * 300, tmp_path)) == sorted(
+        {gk.render_code(code) for chunk in codes for code in chunk})
+
+
+def write_spec(path, location_top30, suffix):
+    path.write_text(json.dumps({
+        "dimensions": {"location_top30": location_top30, "suffix": {"values": suffix}},
+        "types": [{"label": "T1", "priority": 1, "templates": ["{service} in {location_top30}"]},
+                  {"label": "T2", "priority": 1, "templates": ["{service} in {location_top40}",
+                                                               "{service} {suffix}"]}],
+    }), encoding="utf-8")
+    return str(path)
+
+
+def test_incremental_patch_matches_full_rebuild(tmp_path, capsys, restore_spec):
+    before = write_spec(tmp_path / "before.json", {"from": "location", "slice": 30}, ["near me", "prices"])
+    after = write_spec(tmp_path / "after.json", {"from": "location", "slice": 45, "exclude": [gk.locations[0]]},
+                       ["near me", "booking"])
+    patched, rebuilt = tmp_path / "patched.txt", tmp_path / "rebuilt.txt"
+    gk.main(["--spec", before, "--output", str(patched)])
+    gk.main(["--spec", after, "--output", str(patched), "--incremental"])
+    assert "Changed dimensions: location_top30, suffix" in capsys.readouterr().out
+    gk.main(["--spec", after, "--output", str(rebuilt)])
+    assert (tmp_path / "patched.added.txt").read_text(encoding="utf-8")
+    assert (tmp_path / "patched.removed.txt").read_text(encoding="utf-8")
+    assert patched.read_bytes() == rebuilt.read_bytes()
@@ -0,0 +1,32 @@
+import generate_keywords as gk
+from keyword_cardinality import dedup_counts, shared_count, template_pieces
+
+# "x y z" is both "x" + "y z" and "x y" + "z"
+AMBIGUOUS_SPEC = {
+    "dimensions": {"a": {"values": ["x", "x y", "y"]}, "b": {"values": ["y z", "z", "y"]}},
+    "types": [{"label": "T1", "priority": 1, "templates": ["{a} {b}"]},
+              {"label": "T2", "priority": 1, "templates": ["x {b}", "{a} z"]}],
+}
+
+
+def rendered_unique(templates):
+    seen, unique = set(), []
+    for template in templates:
+        keywords = {template.render(index) for index in range(template.size)}
+        unique.append(len(keywords - seen))
+        seen |= keywords
+    return unique
+
+
+def test_ambiguous_templates_are_counted_exactly(restore_spec):
+    gk.set_spec(AMBIGUOUS_SPEC)
+    first = gk.TEMPLATES[0]
+    assert shared_count(template_pieces(first), template_pieces(first)) != first.size
+    results = dedup_counts(gk.TEMPLATES)
+    assert results[0]["ambiguous"]
+    assert [result["unique"] for result in results] == rendered_unique(gk.TEMPLATES)
+
+
+def test_default_spec_counts_match_rendering():
+    small = [template for template in gk.TEMPLATES if template.size <= 20000]
+    assert [result["unique"] for result in dedup_counts(small)] == rendered_unique(small)
@@ -0,0 +1,26 @@
+from keyword_shards import jump_hash, shard_of, stable_hash
+
+KEYWORDS = [f"keyword {i}" for i in range(5000)]
+
+
+def test_hashes_are_stable_across_runs():
+    # Pinned values: changing them would move keywords to different shards
+    assert stable_hash("braids in durban") == 1665116617
+    assert [jump_hash(key, buckets) for key, buckets in [(0, 1), (0, 100), (1, 100), (2**64 - 1, 100),
+                                                          (123456789, 1000)]] == [0, 0, 55, 92, 294]
+    assert [shard_of(keyword, 16) for keyword in
+            ["braids in durban", "nail salon in cape town", "barber near me sandton"]] == [2, 12, 14]
+
+
+def test_adding_a_shard_only_moves_keywords_into_it():
+    for shards in (1, 2, 7, 16):
+        for keyword in KEYWORDS:
+            before, after = shard_of(keyword, shards), shard_of(keyword, shards + 1)
+            assert after in (before, shards)
+
+
+def test_keywords_spread_evenly():
+    counts = [0] * 8
+    for keyword in KEYWORDS:
+        counts[shard_of(keyword, 8)] += 1
+    assert max(counts) < 1.2 * len(KEYWORDS) / 8
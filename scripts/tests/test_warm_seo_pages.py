@@ -0,0 +1,48 @@
+import asyncio
+
+from warm_seo_pages import ConnectionPool
+
+IDLE_TIMEOUT = 0.3
+
+
+async def idle_closing_server():
+    """Keep-alive server that drops a connection after IDLE_TIMEOUT seconds without a request."""
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not line:
+                    break
+                while await reader.readline() not in (b"\r\n", b""):
+                    pass
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+def test_stale_keep_alive_connections_are_replaced():
+    async def scenario():
+        server = await idle_closing_server()
+        port = server.sockets[0].getsockname()[1]
+        pool = ConnectionPool(f"http://127.0.0.1:{port}", timeout=5)
+        try:
+            assert await asyncio.gather(*(pool.get(f"/page-{i}") for i in range(3))) == [200] * 3
+            assert pool.opened == 3
+            await asyncio.sleep(IDLE_TIMEOUT * 2)  # The server drops all three idle connections
+            assert await pool.get("/after-idle") == 200
+            assert pool.opened == 4
+            assert await pool.get("/reused") == 200
+            assert pool.opened == 4
+        finally:
+            await pool.close()
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(scenario())
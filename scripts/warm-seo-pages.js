@@ -2,6 +2,9 @@
  * SEO Page Warmer Script
  * Visits all keyword+location combinations to trigger on-demand page generation
  * 
+ * The /<slug> pages for the keywords from generate_keywords.py are warmed by
+ * scripts/warm_seo_pages.py, which adapts its concurrency and can resume.
+ * 
  * Usage: node scripts/warm-seo-pages.js [--production]
  * 
  * Options:
@@ -0,0 +1,595 @@
+#!/usr/bin/env python3
+"""
+Asyncio page warmer for the generated keyword pages
+
+Requests the /<slug> page (the frontend [keyword] route) of every keyword so
+it is rendered and cached before search engines or visitors ask for it.
+Keywords come from the generator output file that was loaded into
+seo_keywords, its shard directory (generate_keywords.py --shards) or stdin,
+so the warmed pages are exactly the deployed ones, whatever --catalog,
+--spec, --weights or --salons options produced them. They are read as they
+are needed, so memory stays flat.
+
+Requests go over a small pool of keep-alive HTTP/1.1 connections opened
+with asyncio.open_connection, so no HTTP library is needed. Concurrency is
+adjusted AIMD-style, as TCP does: it grows by one request per window of
+fast, successful responses and halves when a response is slower than
+--target-latency or the recent error rate passes --max-error-rate, at most
+once per round trip.
+
+Latencies of served pages are counted in log-spaced buckets (about 9%
+wide), which give the p50/p95/p99 report and the histogram. Progress is
+saved to a checkpoint: the last keyword before which every keyword has
+finished, plus the counters. A rerun resumes after that keyword. A shard
+directory is resumed per shard as well, skipping shards with a current
+.warm.done marker.
+
+--stand-in serves the pages from a local stand-in server whose latency
+grows and which answers 503 as it is overloaded, to try settings without
+touching a real deployment.
+
+warm-seo-pages.js still warms the /<keyword>/<province>/<city> pages built
+from the API's keyword and location lists.
+
+Usage:
+  python scripts/warm_seo_pages.py keyword_list.txt [--base-url URL | --production]
+  python scripts/warm_seo_pages.py keyword_list.shards --worker 0/4
+  sort -u extra_keywords.txt | python scripts/warm_seo_pages.py - --production
+  python scripts/warm_seo_pages.py keyword_list.txt --stand-in --limit 20000
+"""
+
+import argparse
+import asyncio
+import collections
+import contextlib
+import json
+import math
+import os
+import random
+import ssl
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+from generate_keywords import atomic_write, read_lines, slugify
+
+DEFAULT_BASE_URL = "http://localhost:3001"
+DEFAULT_PATH = "/{slug}"
+USER_AGENT = "StylrSA-Warmer/1.0"
+SHARD_STAGE = "warm"
+# Latency buckets per doubling; 8 keeps each bucket within about 9%
+BUCKETS_PER_DOUBLING = 8
+# Recent responses the error rate is measured over, and the fewest it needs
+ERROR_WINDOW = 50
+MIN_ERROR_SAMPLES = 10
+DECREASE_FACTOR = 0.5
+READ_CHUNK = 64 * 1024
+REPORT_EVERY = 10
+CHECKPOINT_EVERY = 5
+
+
+class HTTPError(Exception):
+    """A response the warmer could not read, or a connection that failed."""
+
+
+# --- HTTP ---
+class ConnectionPool:
+    """
+    Keep-alive HTTP/1.1 connections to one origin. Idle connections are
+    reused; a request that fails on a reused connection (the server may
+    have closed it while idle, e.g. after Node's 5 s keepAliveTimeout) is
+    retried once on a new one, and the other idle connections, which have
+    most likely been dropped too, are closed.
+    """
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"expected an http(s) URL, got {base_url!r}")
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self.host_header = parts.netloc
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.opened = 0
+        self._idle = []
+
+    async def _connect(self):
+        self.opened += 1
+        return await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+
+    async def get(self, path):
+        """GET prefix + path, read and discard the body; returns the status code."""
+        request = (f"GET {self.prefix}{path} HTTP/1.1\r\nHost: {self.host_header}\r\n"
+                   f"User-Agent: {USER_AGENT}\r\nAccept: text/html,*/*\r\n\r\n").encode("latin-1")
+        for attempt in range(2):
+            # The retry always connects afresh: another idle connection is as likely to be stale
+            reused = attempt == 0 and bool(self._idle)
+            try:
+                reader, writer = self._idle.pop() if reused else await asyncio.wait_for(self._connect(),
+                                                                                         self.timeout)
+            except (OSError, asyncio.TimeoutError) as error:
+                raise HTTPError(f"connect: {error or type(error).__name__}")
+            try:
+                writer.write(request)
+                status, keep_alive = await asyncio.wait_for(self._read_response(reader), self.timeout)
+            except (OSError, ValueError, asyncio.IncompleteReadError, asyncio.TimeoutError, HTTPError) as error:
+                writer.close()
+                if reused and not isinstance(error, asyncio.TimeoutError):
+                    self._close_idle()
+                    continue
+                raise HTTPError(str(error) or type(error).__name__)
+            except BaseException:
+                writer.close()
+                raise
+            if keep_alive:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+            return status
+
+    @staticmethod
+    async def _read_response(reader):
+        """Read one response; returns (status, whether the connection can be reused)."""
+        while True:
+            status_line = await reader.readline()
+            if not status_line:
+                raise HTTPError("connection closed")
+            parts = status_line.split(None, 2)
+            if len(parts) < 2 or not parts[0].startswith(b"HTTP/"):
+                raise HTTPError(f"bad status line {status_line[:60]!r}")
+            status = int(parts[1])
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip().lower()
+            if status >= 200:
+                break  # 1xx responses are followed by the real one
+
+        keep_alive = parts[0] != b"HTTP/1.0" and headers.get("connection") != "close"
+        if "chunked" in headers.get("transfer-encoding", ""):
+            while size := int((await reader.readline()).split(b";")[0], 16):
+                await reader.readexactly(size + 2)
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # Trailers
+        elif "content-length" in headers:
+            remaining = int(headers["content-length"])
+            while remaining:
+                remaining -= len(await reader.readexactly(min(remaining, READ_CHUNK)))
+        elif status not in (204, 304):
+            while await reader.read(READ_CHUNK):
+                pass
+            keep_alive = False
+        return status, keep_alive
+
+    def _close_idle(self):
+        """Close the idle connections; returns their writers."""
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        return [writer for _, writer in idle]
+
+    async def close(self):
+        for writer in self._close_idle():
+            with contextlib.suppress(OSError):
+                await writer.wait_closed()
+
+
+# --- Concurrency and statistics ---
+class AIMD:
+    """
+    Concurrency limit with additive increase (+1 per window of good
+    responses) and multiplicative decrease on slow responses or a high
+    recent error rate. Responses to requests sent before the last decrease
+    are ignored for decreases, so one burst only halves the limit once.
+    """
+
+    def __init__(self, initial, maximum, target_latency, max_error_rate, minimum=1):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.max_error_rate = max_error_rate
+        self.recent = collections.deque(maxlen=ERROR_WINDOW)
+        self.last_decrease = 0.0
+        self.decreases = 0
+        self.peak = self.limit
+
+    def record(self, started, latency, failed):
+        self.recent.append(failed)
+        error_rate = sum(self.recent) / len(self.recent)
+        congested = latency > self.target_latency or (len(self.recent) >= MIN_ERROR_SAMPLES
+                                                      and error_rate > self.max_error_rate)
+        if congested:
+            if started >= self.last_decrease:
+                self.limit = max(self.minimum, self.limit * DECREASE_FACTOR)
+                self.last_decrease = time.monotonic()
+                self.decreases += 1
+                self.recent.clear()
+        elif not failed:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self.peak = max(self.peak, self.limit)
+
+    @property
+    def allowed(self):
+        return int(self.limit)
+
+
+class LatencyHistogram:
+    """Counts of latencies in log-spaced millisecond buckets; bucket 0 holds everything under 1 ms."""
+
+    def __init__(self, counts=None):
+        self.counts = collections.Counter({int(bucket): count for bucket, count in (counts or {}).items()})
+
+    def add(self, seconds):
+        ms = seconds * 1000
+        self.counts[0 if ms < 1 else 1 + int(math.log2(ms) * BUCKETS_PER_DOUBLING)] += 1
+
+    @staticmethod
+    def upper_ms(bucket):
+        return 2 ** (bucket / BUCKETS_PER_DOUBLING)
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def percentile(self, fraction):
+        """Upper bound in ms of the bucket holding the given fraction of latencies."""
+        rank = max(1, math.ceil(fraction * self.total))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return self.upper_ms(bucket)
+        return 0.0
+
+    def summary(self):
+        if not self.total:
+            return "no responses yet"
+        return " ".join(f"p{label} {self.percentile(fraction):,.0f} ms"
+                        for label, fraction in (("50", 0.5), ("95", 0.95), ("99", 0.99)))
+
+    def print_bars(self, width=40):
+        """Print the counts regrouped by doubling of latency."""
+        grouped = collections.Counter()
+        for bucket, count in self.counts.items():
+            grouped[0 if bucket == 0 else (bucket - 1) // BUCKETS_PER_DOUBLING + 1] += count
+        peak = max(grouped.values(), default=0)
+        for group in sorted(grouped):
+            upper = 2 ** group
+            label = "< 1 ms" if group == 0 else f"{upper // 2:,}-{upper:,} ms"
+            bar = "#" * max(1, round(grouped[group] / peak * width))
+            print(f"  {label:>17}  {grouped[group]:>10,}  {bar}")
+
+
+class Progress:
+    """
+    Counters for one warm, and the checkpoint position: `last` is the
+    keyword before which every keyword (in stream order) has finished.
+    """
+
+    def __init__(self, state=None):
+        state = state or {}
+        self.source = state.get("source")
+        self.last = state.get("last")
+        self.done = state.get("done", 0)
+        self.requests = state.get("requests", 0)
+        self.failures = state.get("failures", 0)
+        self.statuses = collections.Counter(state.get("statuses", {}))
+        self.histogram = LatencyHistogram(state.get("histogram"))
+        self._next = 0
+        self._finished = {}
+
+    def start(self, source, last=None):
+        self.source, self.last = source, last
+        self._next = 0
+        self._finished.clear()
+
+    def finish(self, position, keyword):
+        """Mark the keyword at `position` in the stream finished and advance `last` past every finished one."""
+        self._finished[position] = keyword
+        while self._next in self._finished:
+            self.last = self._finished.pop(self._next)
+            self._next += 1
+            self.done += 1
+
+    def state(self):
+        return {"source": self.source, "last": self.last, "done": self.done, "requests": self.requests,
+                "failures": self.failures, "statuses": dict(self.statuses),
+                "histogram": dict(self.histogram.counts)}
+
+
+def load_checkpoint(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_checkpoint(path, progress):
+    with atomic_write(path) as f:
+        json.dump(progress.state(), f)
+
+
+# --- Warming ---
+class Warmer:
+    def __init__(self, pool, controller, progress, path_template=DEFAULT_PATH, checkpoint=None, failed_file=None):
+        self.pool = pool
+        self.controller = controller
+        self.progress = progress
+        self.path_template = path_template
+        self.checkpoint = checkpoint
+        self.failed_file = failed_file
+        self._started = time.monotonic()
+        self._last_report = self._last_save = self._started
+
+    def url_path(self, keyword):
+        return self.path_template.format(slug=slugify(keyword), keyword=quote(keyword))
+
+    async def _fetch(self, position, keyword):
+        progress = self.progress
+        started = time.monotonic()
+        try:
+            status = await self.pool.get(self.url_path(keyword))
+        except HTTPError as error:
+            status, detail = None, str(error)
+        latency = time.monotonic() - started
+        # Overload and server errors are congestion signals; 404s and the like are not
+        congested = status is None or status == 429 or status >= 500
+        self.controller.record(started, latency, congested)
+        progress.requests += 1
+        progress.statuses[str(status or "error")] += 1
+        if status is not None and status < 400:
+            progress.histogram.add(latency)
+        if status is None or status >= 400:
+            progress.failures += 1
+            if self.failed_file:
+                self.failed_file.write(f"{keyword}\n")
+            if progress.failures <= 10:
+                print(f"  ❌ {keyword}: {detail if status is None else status}")
+        progress.finish(position, keyword)
+
+    def _tick(self, force=False):
+        now = time.monotonic()
+        if self.checkpoint and (force or now - self._last_save >= CHECKPOINT_EVERY):
+            self._last_save = now
+            save_checkpoint(self.checkpoint, self.progress)
+        if not force and now - self._last_report >= REPORT_EVERY:
+            rate = self.progress.requests / (now - self._started) if now > self._started else 0
+            print(f"  {self.progress.done:,} pages | {rate:,.0f}/s | concurrency {self.controller.allowed} | "
+                  f"{self.progress.histogram.summary()} | {self.progress.failures:,} failed")
+            self._last_report = now
+
+    async def run(self, keywords, source, limit=None):
+        """Warm the keywords, resuming after the checkpoint's last keyword when it is for the same source."""
+        resume_after = self.progress.last if self.progress.source == source else None
+        self.progress.start(source, resume_after)
+        if resume_after is not None:
+            # Streams are sorted, so everything up to the checkpoint is done
+            keywords = (keyword for keyword in keywords if keyword > resume_after)
+        if limit is not None:
+            keywords = islice(keywords, max(0, limit))
+
+        in_flight = set()
+        previous_slug = None
+        position = 0
+        try:
+            for keyword in keywords:
+                slug = slugify(keyword)
+                if not slug or slug == previous_slug:
+                    continue  # Same page as the previous keyword
+                previous_slug = slug
+                while len(in_flight) >= self.controller.allowed:
+                    _, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    self._tick()
+                in_flight.add(asyncio.create_task(self._fetch(position, keyword)))
+                position += 1
+            while in_flight:
+                _, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                self._tick()
+        finally:
+            for task in in_flight:
+                task.cancel()
+            self._tick(force=True)
+        return position
+
+
+def stdin_keywords():
+    for line in sys.stdin:
+        keyword = line.rstrip("\n")
+        if keyword:
+            yield keyword
+
+
+# --- Stand-in server ---
+class StandInServer:
+    """
+    Local HTTP/1.1 keep-alive server standing in for the site. Each request
+    takes `latency` seconds, stretched in proportion once more than
+    `capacity` are in progress; past twice the capacity it answers 503, and
+    it fails another `error_rate` of requests with 500.
+    """
+
+    def __init__(self, latency=0.02, capacity=16, error_rate=0.0, seed=1):
+        self.latency = latency
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.active = self.requests = self.connections = 0
+        self.server = None
+        self._handlers = set()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        return f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+
+    async def _serve(self, reader, writer):
+        self.connections += 1
+        self._handlers.add(asyncio.current_task())
+        try:
+            while await reader.readline():
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                self.requests += 1
+                self.active += 1
+                try:
+                    if self.active > 2 * self.capacity:
+                        status, body = 503, b"overloaded"
+                    else:
+                        await asyncio.sleep(self.latency * max(1.0, self.active / self.capacity))
+                        failed = self.random.random() < self.error_rate
+                        status, body = (500, b"error") if failed else (200, b"<html>ok</html>")
+                finally:
+                    self.active -= 1
+                writer.write(f"HTTP/1.1 {status} X\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            self._handlers.discard(asyncio.current_task())
+
+    async def close(self):
+        """Stop listening and wait for open connections to be closed by the client."""
+        self.server.close()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+
+
+# --- CLI ---
+async def warm(args, sources):
+    stand_in = None
+    base_url = args.base_url
+    if args.stand_in:
+        stand_in = StandInServer(args.stand_in_latency / 1000, args.stand_in_capacity, args.stand_in_error_rate)
+        base_url = await stand_in.start()
+        print(f"Stand-in server at {base_url} (capacity {args.stand_in_capacity}, "
+              f"{args.stand_in_latency:g} ms, {args.stand_in_error_rate:.0%} errors)")
+
+    state = load_checkpoint(args.checkpoint) if args.checkpoint and not args.restart else None
+    if state:
+        print(f"Resuming from {args.checkpoint}: {state['done']:,} pages done, after {state['last']!r}")
+    progress = Progress(state)
+    pool = ConnectionPool(base_url, args.timeout)
+    controller = AIMD(args.concurrency, args.max_concurrency, args.target_latency / 1000, args.max_error_rate)
+    failed_file = open(args.failed, "a", encoding="utf-8") if args.failed else None
+    warmer = Warmer(pool, controller, progress, args.path, args.checkpoint, failed_file)
+    started = time.perf_counter()
+    remaining = args.limit
+    try:
+        for source, keywords, on_done in sources:
+            sent = await warmer.run(keywords, source, remaining)
+            if remaining is not None:
+                remaining -= sent
+                if remaining <= 0:
+                    break
+            if on_done:
+                on_done()
+    finally:
+        await pool.close()
+        if failed_file:
+            failed_file.close()
+        if stand_in:
+            await stand_in.close()
+    elapsed = time.perf_counter() - started
+    warmed = progress.requests - (state or {}).get("requests", 0)
+
+    print()
+    print(f"✅ Warmed {warmed:,} pages in {elapsed:.1f}s ({warmed / elapsed if elapsed else 0:,.0f}/s)")
+    print(f"   Total so far: {progress.done:,} pages, {progress.failures:,} failed")
+    print(f"   Status codes: {', '.join(f'{code}: {count:,}' for code, count in sorted(progress.statuses.items()))}")
+    print(f"   Connections opened: {pool.opened:,}")
+    print(f"   Concurrency: peak {controller.peak:.0f}, final {controller.allowed}, "
+          f"{controller.decreases:,} decreases")
+    print(f"   Latency: {progress.histogram.summary()}")
+    progress.histogram.print_bars()
+    if stand_in:
+        print(f"   Stand-in served {stand_in.requests:,} requests over {stand_in.connections:,} connections")
+
+
+def shard_sources(shard_dir, worker):
+    """One (source, keywords, on_done) per pending shard of this worker, marking each warmed when done."""
+    from keyword_shards import load_manifest, mark_done, pending, read_shard
+    manifest = load_manifest(shard_dir)
+    todo = [index for index in pending(shard_dir, manifest, SHARD_STAGE)
+            if worker is None or index % worker[1] == worker[0]]
+    print(f"{len(todo)} of {manifest['shards']} shards to warm in {shard_dir}")
+    for index in todo:
+        part = manifest["parts"][index]
+        print(f"Warming {part['file']} ({part['keywords']:,} keywords)...")
+        yield (part["sha256"], read_shard(shard_dir, index, manifest),
+               lambda index=index: mark_done(shard_dir, index, manifest, SHARD_STAGE))
+
+
+def main(argv=None):
+    from keyword_shards import parse_shard
+    from keyword_sitemap import DEFAULT_BASE_URL as PRODUCTION_URL
+
+    parser = argparse.ArgumentParser(description="Warm the generated keyword pages over keep-alive connections")
+    parser.add_argument("source",
+                        help="Keyword list, shard directory (generate_keywords.py --shards) or - for stdin")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--base-url", default=DEFAULT_BASE_URL, help=f"Site to warm (default: {DEFAULT_BASE_URL})")
+    target.add_argument("--production", action="store_const", dest="base_url", const=PRODUCTION_URL,
+                        help=f"Warm {PRODUCTION_URL} ($FRONTEND_URL)")
+    target.add_argument("--stand-in", action="store_true", help="Warm a local stand-in server instead")
+    parser.add_argument("--path", default=DEFAULT_PATH,
+                        help="Page path for a keyword, with {slug} and/or {keyword} (default: /{slug})")
+    parser.add_argument("--concurrency", type=int, default=4, help="Starting concurrency (default: 4)")
+    parser.add_argument("--max-concurrency", type=int, default=64, help="Concurrency ceiling (default: 64)")
+    parser.add_argument("--target-latency", type=float, default=2000, metavar="MS",
+                        help="Responses slower than this halve concurrency (default: 2000)")
+    parser.add_argument("--max-error-rate", type=float, default=0.05,
+                        help=f"Error rate over the last {ERROR_WINDOW} responses that halves concurrency "
+                             "(default: 0.05)")
+    parser.add_argument("--timeout", type=float, default=30, metavar="SECONDS",
+                        help="Per-request timeout (default: 30)")
+    parser.add_argument("--checkpoint", default=None, metavar="PATH",
+                        help="Checkpoint to resume from and update "
+                             "(default: <source>.warm.json, or warm-<worker>.json in a shard directory)")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    parser.add_argument("--failed", default=None, metavar="PATH", help="Append keywords whose page failed here")
+    parser.add_argument("--limit", type=int, default=None, metavar="N", help="Stop after N pages")
+    parser.add_argument("--worker", type=parse_shard, default=None, metavar="K/N",
+                        help="With a shard directory, warm only the shards where index %% N == K")
+    parser.add_argument("--stand-in-latency", type=float, default=20, metavar="MS",
+                        help="Stand-in response time under capacity (default: 20)")
+    parser.add_argument("--stand-in-capacity", type=int, default=16,
+                        help="Requests the stand-in serves at once before slowing down (default: 16)")
+    parser.add_argument("--stand-in-error-rate", type=float, default=0.0,
+                        help="Fraction of stand-in requests that fail with 500 (default: 0)")
+    args = parser.parse_args(argv)
+
+    if not 1 <= args.concurrency <= args.max_concurrency:
+        parser.error("--concurrency must be between 1 and --max-concurrency")
+    if "{slug}" not in args.path and "{keyword}" not in args.path:
+        parser.error("--path needs {slug} or {keyword}")
+    shard_dir = args.source if os.path.isdir(args.source) else None
+    if args.worker and not shard_dir:
+        parser.error("--worker needs a shard directory")
+
+    if args.source == "-":
+        sources = [("stdin", stdin_keywords(), None)]
+    elif shard_dir:
+        sources = shard_sources(shard_dir, args.worker)
+        if args.checkpoint is None:
+            name = f"warm-{args.worker[0]}-of-{args.worker[1]}.json" if args.worker else "warm.json"
+            args.checkpoint = str(Path(shard_dir) / name)
+    else:
+        sources = [(os.path.abspath(args.source), read_lines(args.source), None)]
+        args.checkpoint = args.checkpoint or f"{os.path.splitext(args.source)[0]}.warm.json"
+
+    print("🔥 SEO page warmer")
+    print(f"📍 Target: {'stand-in server' if args.stand_in else args.base_url}{args.path}")
+    try:
+        asyncio.run(warm(args, sources))
+    except KeyboardInterrupt:
+        print(f"\nStopped; progress saved to {args.checkpoint}" if args.checkpoint else "\nStopped")
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()